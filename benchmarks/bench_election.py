@@ -0,0 +1,173 @@
+"""End-to-end DataManager benchmarks against SQLite and FileStorage.
+
+Usage:
+    python -m benchmarks.bench_election [--scales 200x10x150,2000x20x1500]
+        [--backends sqlite,file] [--output results.json] [--compare old.json]
+
+Each scale is PARTICIPANTSxTEAMSxVOTES. Results are written as JSON (with
+the git commit) so runs from different commits can be compared with
+--compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import generate_election
+
+DEFAULT_SCALES = "200x10x150,2000x20x1500,10000x40x8000"
+
+# FileStorage rewrites its whole JSON file per write, so large scales take minutes
+FILE_STORAGE_MAX_PARTICIPANTS = 2000
+
+def parse_scales(text):
+    scales = []
+    for item in text.split(","):
+        participants, teams, votes = (int(part) for part in item.lower().split("x"))
+        scales.append((participants, teams, votes))
+    return scales
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def summarize(backend, scale, operation, durations):
+    """Turn per-call durations (seconds) into one result row"""
+    ordered = sorted(durations)
+    return {
+        "backend": backend,
+        "scale": "x".join(str(part) for part in scale),
+        "operation": operation,
+        "calls": len(ordered),
+        "total_s": round(sum(ordered), 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+def make_data_manager(backend, workdir):
+    from utils.data_manager import DataManager
+
+    if backend == "sqlite":
+        from utils.db_manager import DatabaseManager
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        return DataManager(DatabaseManager())
+    if backend == "file":
+        from utils.file_storage import FileStorage
+        return DataManager(FileStorage(os.path.join(workdir, "bench.json")))
+    raise ValueError(f"Unknown backend: {backend}")
+
+def run_scale(backend, scale, repeat, seed):
+    participants, teams, votes = scale
+    election = generate_election(participants, teams, votes, seed=seed)
+    rows = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_manager = make_data_manager(backend, workdir)
+        data_manager.db.clear_all_data()
+        data_manager.update_teams(election.teams)
+
+        email_text = "\n".join(election.emails)
+        rows.append(summarize(backend, scale, "add_participants_bulk",
+                              [timed(data_manager.add_participants_bulk, email_text)]))
+
+        # Team assignment is setup, not part of the measured workload
+        data_manager.db.assign_teams(election.assignments())
+
+        rows.append(summarize(backend, scale, "cast_vote", [
+            timed(data_manager.cast_vote, email, teams) for email, teams in election.ballots
+        ]))
+
+        for operation in ("get_results_data", "get_team_stats", "get_voting_stats"):
+            method = getattr(data_manager, operation)
+            rows.append(summarize(backend, scale, operation, [timed(method) for _ in range(repeat)]))
+
+        # Login lookups: the three checks a student login performs
+        rng = random.Random(seed)
+        sample = rng.sample(election.emails, min(len(election.emails), 200))
+
+        def login(email):
+            if data_manager.is_email_registered(email):
+                data_manager.has_voted(email)
+                data_manager.get_user_team(email)
+
+        rows.append(summarize(backend, scale, "login_lookup", [timed(login, email) for email in sample]))
+
+        session = getattr(data_manager.db, "session", None)
+        if session is not None:
+            session.close()
+
+    return rows
+
+def compare(current, baseline_path):
+    """Print the change in mean latency per (backend, scale, operation)"""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+
+    previous = {(row["backend"], row["scale"], row["operation"]): row for row in baseline["results"]}
+    print(f"\nvs {baseline.get('commit', '?')} ({baseline_path})")
+    print(f"{'backend':8} {'scale':18} {'operation':22} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for row in current["results"]:
+        old = previous.get((row["backend"], row["scale"], row["operation"]))
+        if not old:
+            continue
+        change = (row["mean_ms"] / old["mean_ms"] - 1) * 100 if old["mean_ms"] else 0.0
+        print(f"{row['backend']:8} {row['scale']:18} {row['operation']:22} "
+              f"{old['mean_ms']:>10.3f} {row['mean_ms']:>10.3f} {change:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES)
+    parser.add_argument("--backends", default="sqlite,file")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per read operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/election-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = []
+    for backend in args.backends.split(","):
+        for scale in parse_scales(args.scales):
+            if backend == "file" and scale[0] > FILE_STORAGE_MAX_PARTICIPANTS:
+                print(f"skip file {scale}: above {FILE_STORAGE_MAX_PARTICIPANTS} participants")
+                continue
+            print(f"running {backend} {scale} ...", flush=True)
+            results.extend(run_scale(backend, scale, args.repeat, args.seed))
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    output = args.output or os.path.join("benchmarks", "results", f"election-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+
+    for row in results:
+        print(f"{row['backend']:8} {row['scale']:18} {row['operation']:22} "
+              f"mean {row['mean_ms']:>9.3f} ms  p95 {row['p95_ms']:>9.3f} ms  ({row['calls']} calls)")
+    print(f"wrote {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
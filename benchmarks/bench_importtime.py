@@ -0,0 +1,98 @@
+"""Import cost of the first page after a deploy or restart.
+
+Usage:
+    python -m benchmarks.bench_importtime [--repeat 3] [--top 15] [--output importtime.json]
+
+Runs app.py in Streamlit bare mode (which renders the login page) under
+`python -X importtime` against a throwaway SQLite database, then imports
+each page module on top of that. Reports wall time, cumulative import
+time per top-level package, and whether heavy libraries (pandas, Plotly,
+NumPy, PyArrow) were loaded. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Streamlit itself loads the lazy plotly.graph_objects stub, so track plotly.express
+HEAVY_MODULES = ("pandas", "plotly.express", "numpy", "pyarrow")
+
+PAGE_MODULES = ("pages.auth_page", "pages.student_voting", "pages.admin_dashboard", "pages.results_display")
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def parse_importtime(stderr):
+    """Map module name to (cumulative microseconds, nesting depth)"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(2)), len(match.group(3)) // 2)
+    return modules
+
+def run_importtime(args, env):
+    """Run one interpreter under -X importtime; returns (wall ms, modules)"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    return wall_ms, parse_importtime(completed.stderr)
+
+def summarize(runs, top):
+    """Median wall/import time, heaviest top-level imports and heavy libraries loaded"""
+    wall_ms = statistics.median(wall for wall, _ in runs)
+    modules = runs[-1][1]
+    top_level = sorted(
+        ((name, cumulative) for name, (cumulative, depth) in modules.items() if depth == 0),
+        key=lambda item: item[1], reverse=True
+    )
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(cumulative for _, cumulative in top_level) / 1000, 1),
+        "modules": len(modules),
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in modules],
+        "top_imports_ms": [[name, round(cumulative / 1000, 1)] for name, cumulative in top_level[:top]],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'importtime.db')}"}
+
+        # Bare-mode run once first so schema migration isn't part of the measurement
+        run_importtime(["app.py"], env)
+
+        scenarios = {"login_page": ["app.py"]}
+        for module in PAGE_MODULES:
+            scenarios[module] = ["-c", f"import utils.data_manager, {module}"]
+
+        report = {"python": sys.version.split()[0], "scenarios": {}}
+        for name, command in scenarios.items():
+            runs = [run_importtime(command, env) for _ in range(args.repeat)]
+            report["scenarios"][name] = summarize(runs, args.top)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Peak-memory comparison of dict-building vs streaming participant/vote reads.
+
+Usage:
+    python -m benchmarks.bench_memory [--rows 50000]
+
+Seeds a throwaway SQLite database, then measures the tracemalloc peak of
+each read path. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+def seed_database(db, rows, teams=20, seed=42):
+    """Insert participants and votes directly with executemany"""
+    from utils.auth import hash_email
+    from utils.db_manager import Participant, Team, Vote
+
+    rng = random.Random(seed)
+    team_names = [f"팀 {i + 1}" for i in range(teams)]
+    now = datetime.now()
+
+    db.session.execute(Team.__table__.delete())
+    db.session.execute(Team.__table__.insert(), [{"name": name, "created_at": now} for name in team_names])
+
+    participants = []
+    votes = []
+    for i in range(rows):
+        email = f"student{i:06d}@example.com"
+        team = team_names[i % teams]
+        participants.append({"email": email, "team": team, "voter_hash": hash_email(email), "created_at": now})
+        choices = rng.sample([name for name in team_names if name != team], 2)
+        votes.append({"email_hash": hash_email(email), "selected_teams": json.dumps(choices), "voted_at": now})
+
+    db.session.execute(Participant.__table__.insert(), participants)
+    db.session.execute(Vote.__table__.insert(), votes)
+    db.session.commit()
+
+def measure(label, func):
+    """Run func under tracemalloc and report peak memory and wall time"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"case": label, "peak_mib": round(peak / 1024 / 1024, 2), "seconds": round(elapsed, 3)}
+
+def consume(iterable):
+    """Exhaust an iterator without keeping its items"""
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        from utils.db_manager import DatabaseManager
+
+        db = DatabaseManager()
+        seed_database(db, args.rows)
+        db.session.expunge_all()
+
+        results = [
+            measure("get_participants (dict)", db.get_participants),
+            measure("iter_participants (stream)", lambda: consume(db.iter_participants(args.batch_size))),
+            measure("get_votes (dict)", db.get_votes),
+            measure("iter_votes (stream)", lambda: consume(db.iter_votes(args.batch_size))),
+            measure("get_results_data", db.get_results_data),
+        ]
+        db.session.close()
+
+    print(json.dumps({"rows": args.rows, "batch_size": args.batch_size, "results": results},
+                     ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
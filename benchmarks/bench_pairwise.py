@@ -0,0 +1,83 @@
+"""Pairwise matrix cost: incremental pair counts vs recomputing from raw votes.
+
+Usage:
+    python -m benchmarks.bench_pairwise [--ballots 20000] [--teams 30] [--depth 10] [--batch 64]
+
+Stores random ballots of every list/score ballot type in a throwaway SQLite
+database through DatabaseManager.insert_votes_batch (which keeps pair_counts
+up to date in the same transaction), then compares reading the Copeland
+summary from pair_counts against rebuilding it from every stored vote, and
+checks that both give identical matrices. Prints JSON and exits with
+status 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_tally import generate
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+def run(ballot_type, args, workdir):
+    from utils.db_manager import DatabaseManager, Team, rebuild_pair_counts
+    from utils.pairwise import matrices_from_ballots, pairwise_summary
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, ballot_type + '.db')}"
+    db = DatabaseManager()
+    teams, ballots = generate(ballot_type, args.ballots, args.teams, args.depth)
+    existing = set(db.get_teams())
+    db.session.add_all(Team(name=team) for team in teams if team not in existing)
+    db.session.commit()
+    db.set_ballot_type(ballot_type)
+
+    now = datetime.now()
+    votes = [(f"{ballot_type}-{index:07d}", ballot, now) for index, ballot in enumerate(ballots)]
+    _, insert_ms = timed(lambda: [db.insert_votes_batch(votes[start:start + args.batch])
+                                  for start in range(0, len(votes), args.batch)])
+
+    incremental, read_ms = timed(lambda: db.get_pair_matrices(teams))
+    _, summary_ms = timed(lambda: pairwise_summary(teams, *incremental, len(ballots)))
+
+    stored = [vote["teams"] for vote in db.get_votes().values()]
+    recomputed, recompute_ms = timed(lambda: matrices_from_ballots(ballot_type, teams, stored))
+    _, rebuild_ms = timed(lambda: rebuild_pair_counts(db.session.connection()))
+    db.session.commit()
+    rebuilt = db.get_pair_matrices(teams)
+    db.release()
+
+    same = all((a == b).all() for a, b in zip(incremental, recomputed)) and \
+        all((a == b).all() for a, b in zip(incremental, rebuilt))
+    return {
+        "insert_with_pairs_ms": insert_ms,
+        "read_pair_counts_ms": read_ms,
+        "summary_ms": summary_ms,
+        "recompute_from_votes_ms": recompute_ms,
+        "rebuild_table_ms": rebuild_ms,
+        "incremental_matches_rebuild": bool(same),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ballots", type=int, default=20_000)
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args()
+
+    report = {"ballots": args.ballots, "teams": args.teams, "depth": args.depth, "types": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        for ballot_type in ("pick_two", "approval", "score", "ranked"):
+            report["types"][ballot_type] = run(ballot_type, args, workdir)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if all(row["incremental_matches_rebuild"] for row in report["types"].values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Bytes sent to the browser per rerun on the student voting page.
+
+Usage:
+    python -m benchmarks.bench_payload [--teams 8] [--toggles 10]
+
+Drives app.py with Streamlit's AppTest against a throwaway SQLite
+database: a student logs in, then toggles team checkboxes. For every rerun
+it records the serialized size of the ForwardMsgs the script produced,
+which is what the server would push over the websocket. Results are
+printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+STUDENT_EMAIL = "payload.student@example.com"
+
+def seed(teams):
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    for index in range(2, teams + 1):
+        db.add_team(f"팀 {index}")
+    db.add_participant(STUDENT_EMAIL, "팀 1")
+    db.release()
+
+def instrument_runner(sizes):
+    """Record the total ByteSize of each rerun's outgoing messages"""
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    original = LocalScriptRunner.forward_msgs
+
+    def forward_msgs(self):
+        messages = original(self)
+        sizes.append(sum(message.ByteSize() for message in messages))
+        return messages
+
+    LocalScriptRunner.forward_msgs = forward_msgs
+
+def measure(toggles):
+    from streamlit.testing.v1 import AppTest
+
+    sizes = []
+    instrument_runner(sizes)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    login_bytes = sizes[-1]
+
+    at.text_input[0].input(STUDENT_EMAIL)
+    [button for button in at.button if "투표 참여하기" in button.label][0].click().run()
+    voting_bytes = [sizes[-1]]
+
+    for index in range(toggles):
+        checkbox = at.checkbox[index % 2]
+        (checkbox.uncheck() if checkbox.value else checkbox.check()).run()
+        voting_bytes.append(sizes[-1])
+
+    if at.exception:
+        raise RuntimeError([exception.value for exception in at.exception])
+
+    return {
+        "login_page_bytes": login_bytes,
+        "voting_reruns": len(voting_bytes),
+        "voting_bytes_per_rerun_median": int(statistics.median(voting_bytes)),
+        "voting_bytes_per_rerun_max": max(voting_bytes),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--toggles", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'payload.db')}"
+        seed(args.teams)
+        report = {"teams": args.teams, **measure(args.toggles)}
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Tally engine timing for every ballot type.
+
+Usage:
+    python -m benchmarks.bench_tally [--ballots 100000] [--teams 50] [--depth 50] [--repeat 3]
+
+Generates random ballots in memory (already decoded from JSON, as
+get_results_data hands them over) and times utils.tally.tally_ballots per
+ballot type, against the original per-vote Python loop for list ballots.
+Ranked and approval ballots choose `depth` teams each; score ballots score
+every chosen team 1-5. Results are printed as JSON.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+def generate(ballot_type, ballots, teams, depth, seed=42):
+    rng = random.Random(seed)
+    names = [f"팀 {index + 1}" for index in range(teams)]
+    # Skewed popularity so instant-runoff needs many rounds
+    weights = [1 / (index + 1) for index in range(teams)]
+    generated = []
+    for _ in range(ballots):
+        count = 2 if ballot_type == "pick_two" else rng.randint(1, depth)
+        chosen = list(dict.fromkeys(rng.choices(names, weights, k=count * 2)))[:count]
+        if ballot_type == "score":
+            generated.append({team: rng.randint(1, 5) for team in chosen})
+        else:
+            generated.append(chosen)
+    return names, generated
+
+def loop_tally(teams, ballots):
+    """The pre-NumPy get_results_data counting loop"""
+    team_votes = {team: 0 for team in teams}
+    for selected_teams in ballots:
+        for team in selected_teams:
+            if team in team_votes:
+                team_votes[team] += 1
+    return sorted(team_votes.items(), key=lambda x: x[1], reverse=True)
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, round(min(timings) * 1000, 1), round(statistics.median(timings) * 1000, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ballots", type=int, default=100_000)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from utils.tally import tally_ballots
+
+    report = {"ballots": args.ballots, "teams": args.teams, "depth": args.depth, "types": {}}
+    for ballot_type in ("pick_two", "approval", "score", "ranked"):
+        teams, ballots = generate(ballot_type, args.ballots, args.teams, args.depth)
+        results, best_ms, median_ms = best_of(lambda: tally_ballots(ballot_type, teams, ballots), args.repeat)
+        row = {
+            "choices": sum(map(len, ballots)),
+            "tally_ms": best_ms,
+            "tally_median_ms": median_ms,
+            "winner": results["sorted_results"][0][0],
+        }
+        if "rounds" in results:
+            row["rounds"] = len(results["rounds"])
+        if ballot_type in ("pick_two", "approval"):
+            expected, loop_ms, _ = best_of(lambda: loop_tally(teams, ballots), args.repeat)
+            assert expected == results["sorted_results"]
+            row["python_loop_ms"] = loop_ms
+        report["types"][ballot_type] = row
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Voting timeline refresh cost: incremental watermark vs full regroup.
+
+Usage:
+    python -m benchmarks.bench_timeline [--votes 100000] [--minutes 120] [--refreshes 20] [--new 50]
+
+Bulk-loads a synthetic election whose votes are spread over `minutes` into
+a throwaway SQLite database, then simulates a live event: each refresh
+stores `new` votes through insert_votes_batch and reads the timeline. Times
+the incremental refresh against regrouping every vote, and finally stores a
+vote with an old voted_at (as a spool drain would) to check the fallback.
+Every timeline is compared with a full recount. Prints JSON and exits with
+status 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+def run(args, workdir):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'timeline.db')}"
+    from benchmarks.synthetic import generate_election, load_into_database
+    from utils.db_manager import DatabaseManager, _vote_timelines
+
+    db = DatabaseManager()
+    election = generate_election(args.votes, 30, args.votes)
+    start = datetime.now() - timedelta(minutes=args.minutes)
+    load_into_database(db, election, start=start, spread_minutes=args.minutes)
+
+    def full_recount():
+        return sorted(db._count_votes_per_minute().items())
+
+    _, first_ms = timed(db.get_vote_timeline)
+    incremental_ms, full_ms = [], []
+    matches = True
+    for refresh in range(args.refreshes):
+        now = datetime.now()
+        db.insert_votes_batch([(f"live-{refresh}-{index}", ["팀 1", "팀 2"], now) for index in range(args.new)])
+        timeline, elapsed = timed(db.get_vote_timeline)
+        incremental_ms.append(elapsed)
+        expected, elapsed = timed(full_recount)
+        full_ms.append(elapsed)
+        matches = matches and timeline == expected
+
+    # A spooled vote drained late keeps its original (older) voted_at
+    db.insert_votes_batch([("late-drain", ["팀 1", "팀 2"], start + timedelta(minutes=1))])
+    late_timeline = db.get_vote_timeline()
+    late_ok = late_timeline == full_recount()
+    total = sum(votes for _, votes in late_timeline)
+    _vote_timelines.clear()
+    db.release()
+
+    return {
+        "votes": total,
+        "minutes": len(late_timeline),
+        "first_load_ms": round(first_ms, 1),
+        "incremental_refresh_ms": round(statistics.median(incremental_ms), 2),
+        "full_regroup_ms": round(statistics.median(full_ms), 2),
+        "checks": {
+            "incremental_matches_full": matches,
+            "late_vote_counted": late_ok,
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=100_000)
+    parser.add_argument("--minutes", type=int, default=120)
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--new", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = run(args, workdir)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if all(report["checks"].values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Vote throughput: per-vote COMMIT vs the group-commit vote writer.
+
+Usage:
+    python -m benchmarks.bench_vote_ingest [--votes 2000] [--threads 16] [--database-url URL]
+
+Runs each mode in a fresh interpreter (VOTE_GROUP_COMMIT off, then on)
+against a throwaway SQLite database, or a given DATABASE_URL (emptied
+first, so never point it at a real election). Submitter threads each hold
+their own DatabaseManager, like Streamlit sessions do, and call
+cast_vote; every 10th submission repeats an earlier voter to exercise the
+duplicate answer. Failed submissions (lock timeouts, races) are counted
+as errors. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_worker(votes, threads):
+    """Cast votes from `threads` threads; runs inside the child interpreter"""
+    from utils.auth import hash_email
+    from utils.db_manager import DatabaseManager
+
+    DatabaseManager().clear_all_data()
+    submissions = [hash_email(f"voter{index:06d}@example.com") for index in range(votes)]
+    for index in range(9, votes, 10):
+        submissions[index] = submissions[index - 9]
+
+    latencies = []
+    outcomes = {"accepted": 0, "duplicate": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def submit(chunk):
+        db = DatabaseManager()
+        for email_hash in chunk:
+            started = time.perf_counter()
+            try:
+                outcome = "accepted" if db.cast_vote(email_hash, ["팀 2", "팀 3"]) else "duplicate"
+            except Exception:
+                # E.g. "database is locked" or a duplicate racing past the existence check
+                db.session.rollback()
+                outcome = "errors"
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+        db.release()
+
+    workers = [threading.Thread(target=submit, args=(submissions[index::threads],)) for index in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    db = DatabaseManager()
+    stored = len(db.get_votes())
+    db.release()
+
+    latencies.sort()
+    return {
+        "votes_per_s": round(votes / elapsed, 1),
+        "seconds": round(elapsed, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        **outcomes,
+        "rows_stored": stored,
+    }
+
+def run_mode(group_commit, args, database_url):
+    env = {**os.environ, "DATABASE_URL": database_url, "VOTE_GROUP_COMMIT": "1" if group_commit else "0"}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_vote_ingest", "--worker",
+         "--votes", str(args.votes), "--threads", str(args.threads)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    return json.loads(completed.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--database-url")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.votes, args.threads)))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'ingest.db')}"
+        report = {
+            "votes": args.votes,
+            "threads": args.threads,
+            "per_vote_commit": run_mode(False, args, database_url),
+            "group_commit": run_mode(True, args, database_url),
+        }
+
+    per_vote = report["per_vote_commit"]["votes_per_s"]
+    report["speedup"] = round(report["group_commit"]["votes_per_s"] / per_vote, 2) if per_vote else None
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Fail if DatabaseManager's hot queries fall back to full table scans.
+
+Usage:
+    python -m benchmarks.check_query_plans [--database-url URL]
+
+Compiles the statements DatabaseManager actually runs (the statement
+builders in utils.db_manager) and runs EXPLAIN for each against
+DATABASE_URL (or a throwaway SQLite database migrated to the current
+schema). Exits with status 1 if any plan contains a full scan of the
+queried table. On PostgreSQL,
+sequential scans are disabled for the check so small tables still show
+whether a usable index exists.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+def hot_queries(dialect_name):
+    """(name, statement) for the statements DatabaseManager runs on hot paths"""
+    from utils import db_manager
+
+    return [
+        ("participant_by_email", db_manager.participant_statement("student@example.com")),
+        ("participants_by_team", db_manager.team_members_statement("팀 1")),
+        ("team_member_counts", db_manager.team_member_counts_statement()),
+        ("voted_hashes", db_manager.voted_hashes_statement(["0" * 64, "1" * 64])),
+        ("turnout_by_team", db_manager.turnout_by_team_statement()),
+        ("votes_per_minute_since", db_manager.votes_per_minute_statement(dialect_name, datetime(2000, 1, 1))),
+    ]
+
+def explain_sql(connection, statement):
+    """SQL text of a statement with its parameters rendered inline, ready to prefix with EXPLAIN"""
+    return str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+def full_scans_sqlite(connection, statement):
+    """Plan lines that scan a table without any index"""
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + explain_sql(connection, statement)).all()
+    details = [row[-1] for row in rows]
+    return [detail for detail in details if detail.startswith("SCAN ") and " USING " not in detail], details
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+def full_scans_postgresql(connection, statement):
+    """Seq Scan nodes in the plan, with seqscans discouraged for this transaction"""
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + explain_sql(connection, statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_plan_nodes(plan[0]["Plan"]))
+    details = [f"{node['Node Type']} {node.get('Relation Name', '')}".strip() for node in nodes]
+    return [detail for detail in details if detail.startswith("Seq Scan")], details
+
+def check(engine):
+    """Return (name, full scans, plan) for every hot query"""
+    explain = full_scans_postgresql if engine.dialect.name == "postgresql" else full_scans_sqlite
+    results = []
+    for name, statement in hot_queries(engine.dialect.name):
+        with engine.begin() as connection:
+            scans, plan = explain(connection, statement)
+        results.append((name, scans, plan))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    from utils.migrations import ensure_schema
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'plans.db')}"
+        engine = create_engine(database_url)
+        ensure_schema(engine)
+
+        failures = 0
+        for name, scans, plan in check(engine):
+            status = "FULL SCAN" if scans else "ok"
+            failures += bool(scans)
+            print(f"{status:9}  {name:24}  {' | '.join(plan)}")
+        engine.dispose()
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
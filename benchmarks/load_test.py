@@ -0,0 +1,173 @@
+"""Concurrent voter load test driving the real app.py through Streamlit AppTest.
+
+Usage:
+    python -m benchmarks.load_test [--levels 10,50,100,500,1000] [--max-workers N]
+        [--teams 20] [--output load.json]
+
+Every virtual voter opens its own AppTest session and performs the real
+flow: load the login page, submit a registered email, tick two teams and
+submit the vote. The database is a local SQLite file seeded with enough
+assigned participants for all levels. Per concurrency level the report
+gives rerun latency percentiles, end-to-end voter latency, throughput
+and error rate.
+
+Voters run in a process pool: AppTest swaps a process-global Runtime
+singleton on every run, so concurrent AppTests cannot share a process.
+Concurrency is the number of worker processes (capped by --max-workers);
+1,000 concurrent voters need a host that can hold 1,000 Python processes,
+otherwise split the load across several machines.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_voter(email, timeout):
+    """Drive one login-select-submit flow; returns (rerun latencies, start, end, error or None)"""
+    from streamlit.testing.v1 import AppTest
+
+    reruns = []
+    started = time.time()
+
+    def rerun(element):
+        step_started = time.perf_counter()
+        result = element.run()
+        reruns.append(time.perf_counter() - step_started)
+        if result.exception:
+            raise RuntimeError(result.exception[0].value)
+        return result
+
+    try:
+        at = rerun(AppTest.from_file(APP_PATH, default_timeout=timeout))
+
+        at.text_input[0].input(email)
+        submit = next(button for button in at.button if "투표 참여하기" in button.label)
+        at = rerun(submit.click())
+        if at.session_state["current_page"] != "voting":
+            raise RuntimeError("login rejected")
+
+        if len(at.checkbox) < 2:
+            raise RuntimeError("fewer than two selectable teams")
+        at = rerun(at.checkbox[0].check())
+        at = rerun(at.checkbox[1].check())
+
+        vote = next(button for button in at.button if button.key == "submit_vote")
+        at = rerun(vote.click())
+        if not st_has_voted(at):
+            errors = [element.value for element in at.error]
+            raise RuntimeError(errors[0] if errors else "vote not recorded")
+    except Exception as e:
+        return reruns, started, time.time(), f"{type(e).__name__}: {e}"
+
+    return reruns, started, time.time(), None
+
+def st_has_voted(at):
+    """The completion screen is shown once the vote is stored"""
+    return any("투표가 완료되었습니다" in element.value for element in at.markdown)
+
+def _run_voter_star(args):
+    return run_voter(*args)
+
+def _warm_up_worker(database_url):
+    """Render the login page once so imports and first-run costs are not measured"""
+    os.environ["DATABASE_URL"] = database_url
+    from streamlit.testing.v1 import AppTest
+    AppTest.from_file(APP_PATH, default_timeout=120).run()
+
+def seed(database_path, voters, teams):
+    from benchmarks.synthetic import generate_election, load_into_database
+    from utils.db_manager import DatabaseManager
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    election = generate_election(voters, teams, 0, unassigned_rate=0.0)
+    db = DatabaseManager()
+    load_into_database(db, election)
+    db.session.close()
+    return election.emails
+
+def run_level(level, emails, max_workers, timeout):
+    # Pass workers by their importable name: AppTest rebinds __main__ inside the worker
+    from benchmarks import load_test
+
+    workers = min(level, max_workers) if max_workers else level
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_test._warm_up_worker,
+                             initargs=(os.environ["DATABASE_URL"],)) as executor:
+        # Spin every worker up first so process start-up is not measured
+        list(executor.map(time.sleep, [0.05] * workers))
+        outcomes = list(executor.map(load_test._run_voter_star, [(email, timeout) for email in emails]))
+
+    wall = max(end for _, _, end, _ in outcomes) - min(start for _, start, _, _ in outcomes)
+    reruns = sorted(latency for latencies, _, _, _ in outcomes for latency in latencies)
+    totals = sorted(end - start for _, start, end, _ in outcomes)
+    errors = [error for _, _, _, error in outcomes if error]
+    succeeded = len(outcomes) - len(errors)
+
+    return {
+        "voters": len(outcomes),
+        "concurrency": workers,
+        "succeeded": succeeded,
+        "error_rate": round(len(errors) / len(outcomes), 4) if outcomes else 0.0,
+        "errors": sorted(set(errors))[:5],
+        "wall_s": round(wall, 3),
+        "votes_per_s": round(succeeded / wall, 2) if wall else 0.0,
+        "rerun_p50_ms": round(percentile(reruns, 0.50) * 1000, 1),
+        "rerun_p95_ms": round(percentile(reruns, 0.95) * 1000, 1),
+        "rerun_p99_ms": round(percentile(reruns, 0.99) * 1000, 1),
+        "voter_p50_s": round(percentile(totals, 0.50), 3),
+        "voter_p95_s": round(percentile(totals, 0.95), 3),
+        "voter_mean_s": round(statistics.fmean(totals), 3) if totals else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="10,50,100,500,1000")
+    parser.add_argument("--max-workers", type=int, default=0,
+                        help="cap on worker processes (default: one per virtual voter)")
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--database", help="SQLite file to use (default: temporary)")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_path = args.database or os.path.join(workdir, "load.db")
+        emails = seed(database_path, sum(levels), args.teams)
+
+        results = []
+        offset = 0
+        for level in levels:
+            print(f"concurrency {level} ...", flush=True)
+            results.append(run_level(level, emails[offset:offset + level], args.max_workers, args.timeout))
+            offset += level
+            row = results[-1]
+            print(f"  {row['succeeded']}/{row['voters']} ok on {row['concurrency']} workers, "
+                  f"{row['votes_per_s']} votes/s, "
+                  f"rerun p50/p95/p99 {row['rerun_p50_ms']}/{row['rerun_p95_ms']}/{row['rerun_p99_ms']} ms, "
+                  f"errors {row['error_rate']:.1%}", flush=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "max_workers": args.max_workers,
+        "teams": args.teams,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Outage drill for the local vote spool.
+
+Usage:
+    python -m benchmarks.spool_drill [--votes 300] [--outage 3]
+
+Uses a throwaway SQLite file as a stand-in for the primary database and
+"pauses" it by holding an exclusive lock from another connection, so every
+statement from the app times out the way a stalled server would. Votes are
+cast before, during and after the outage (with a repeat voter in each
+phase); the drill then waits for the spool to drain and checks that every
+accepted vote reached the primary exactly once. Then a few more votes are
+spooled and the next drain has its connection invalidated mid-transaction,
+as a dropped server connection would, to check that the drain recovers; a
+malformed vote is spooled among good ones to check that only it is
+quarantined while the primary stays available; and clear_all_data runs
+while the drain is failing, to check that spooled votes never come back. Prints JSON and exits with
+status 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+class PausableDatabase:
+    """Stand-in primary that can be stalled and resumed"""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+
+    def pause(self):
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        self.connection.execute("BEGIN EXCLUSIVE")
+
+    def resume(self):
+        self.connection.execute("COMMIT")
+        self.connection.close()
+        self.connection = None
+
+def disconnect_once(spool):
+    """Invalidate the drain connection in the middle of the next drain"""
+    from sqlalchemy import text
+
+    drain_batch = spool.drain_batch
+    drain_db = drain_batch.__self__
+    fired = []
+
+    def drain_after_disconnect(rows):
+        if not fired:
+            fired.append(True)
+            drain_db.session.execute(text("SELECT 1"))
+            drain_db.session.connection().invalidate()
+        return drain_batch(rows)
+
+    spool.drain_batch = drain_after_disconnect
+    return fired
+
+def stall_drains(spool):
+    """Make drains fail as if the primary were unreachable until the returned event is set"""
+    import threading
+    from sqlalchemy.exc import OperationalError
+
+    drain_batch = spool.drain_batch
+    released = threading.Event()
+
+    def stalled_drain(rows):
+        if not released.is_set():
+            raise OperationalError("drain", {}, Exception("primary unreachable (drill)"))
+        return drain_batch(rows)
+
+    spool.drain_batch = stalled_drain
+    return released
+
+def wait_for_drain(spool, limit=30):
+    started = time.monotonic()
+    while spool.pending() and time.monotonic() - started < limit:
+        time.sleep(0.1)
+    return round(time.monotonic() - started, 2)
+
+def cast_phase(db, emails):
+    """Cast one vote per email plus a repeat of the first"""
+    from utils.auth import hash_email
+
+    accepted = duplicates = 0
+    slowest = 0.0
+    for email in emails + emails[:1]:
+        started = time.perf_counter()
+        if db.cast_vote(hash_email(email), ["팀 2", "팀 3"]):
+            accepted += 1
+        else:
+            duplicates += 1
+        slowest = max(slowest, time.perf_counter() - started)
+    return {"accepted": accepted, "duplicates": duplicates, "slowest_ms": round(slowest * 1000, 1)}
+
+def run(votes, outage, workdir):
+    primary_path = os.path.join(workdir, "primary.db")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{primary_path}",
+        "VOTE_SPOOL_PATH": os.path.join(workdir, "spool.db"),
+        "DB_TIMEOUT_SECONDS": "0.2",
+        "VOTE_SPOOL_RETRY_SECONDS": "0.5",
+    })
+    from utils.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    primary = PausableDatabase(primary_path)
+    emails = [f"drill{index:05d}@example.com" for index in range(votes)]
+    third = votes // 3
+
+    report = {"votes": votes, "outage_s": outage, "phases": {}}
+    report["phases"]["before"] = cast_phase(db, emails[:third])
+
+    primary.pause()
+    outage_started = time.monotonic()
+    report["phases"]["during"] = cast_phase(db, emails[third:2 * third])
+    report["spooled_during_outage"] = db.spool.pending()
+    time.sleep(max(0.0, outage - (time.monotonic() - outage_started)))
+    primary.resume()
+
+    report["phases"]["after"] = cast_phase(db, emails[2 * third:])
+
+    report["drain_s"] = wait_for_drain(db.spool)
+    report["spool_pending"] = db.spool.pending()
+    report["primary_votes"] = len(db.get_votes())
+
+    from utils.auth import hash_email
+    disconnected = disconnect_once(db.spool)
+    extra = [f"disconnect{index:03d}@example.com" for index in range(10)]
+    for email in extra:
+        db.spool.add(hash_email(email), ["팀 2", "팀 3"])
+    report["disconnect_drain_s"] = wait_for_drain(db.spool)
+    report["disconnect_spool_pending"] = db.spool.pending()
+    disconnect_votes = len(db.get_votes()) - report["primary_votes"]
+
+    stored = len(db.get_votes())
+    good = [f"poison{index:03d}@example.com" for index in range(5)]
+    # A nested list is not a team name; storing its pair counts fails
+    db.spool.add(hash_email("poison@example.com"), [["팀 2"], "팀 3"])
+    for email in good:
+        db.spool.add(hash_email(email), ["팀 2", "팀 3"])
+    report["poison_drain_s"] = wait_for_drain(db.spool)
+    report["quarantined"] = db.spool.quarantined()
+    poison_primary_up = db.spool.primary_available()
+    poison_votes = len(db.get_votes()) - stored
+
+    released = stall_drains(db.spool)
+    for email in [f"reset{index:03d}@example.com" for index in range(5)]:
+        db.spool.add(hash_email(email), ["팀 2", "팀 3"])
+    time.sleep(0.2)
+    spooled_before_reset = db.spool.pending()
+    db.clear_all_data()
+    released.set()
+    time.sleep(1.0)
+    report["votes_after_reset"] = len(db.get_votes())
+    reset_spool_empty = db.spool.pending() == 0 and db.spool.quarantined() == 0
+    db.release()
+
+    accepted = sum(phase["accepted"] for phase in report["phases"].values())
+    report["checks"] = {
+        "every_vote_accepted_once": accepted == votes,
+        "repeat_voters_rejected": all(phase["duplicates"] == 1 for phase in report["phases"].values()),
+        "outage_votes_spooled": report["spooled_during_outage"] > 0,
+        "spool_drained": report["spool_pending"] == 0,
+        "primary_has_every_vote": report["primary_votes"] == votes,
+        "drain_recovered_after_disconnect": bool(disconnected) and report["disconnect_spool_pending"] == 0
+        and disconnect_votes == len(extra),
+        "poison_vote_quarantined": report["quarantined"] == 1 and poison_votes == len(good) and poison_primary_up,
+        "reset_clears_spool": spooled_before_reset > 0 and reset_spool_empty and report["votes_after_reset"] == 0,
+    }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=300)
+    parser.add_argument("--outage", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = run(args.votes, args.outage, workdir)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if all(report["checks"].values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
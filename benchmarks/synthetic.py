@@ -0,0 +1,93 @@
+"""Reproducible synthetic election data.
+
+Team sizes are uneven (gamma-distributed), a small share of participants
+stays unassigned, and ballots favour popular teams following a Zipf-like
+distribution, which is closer to a real event than uniform choices.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+class SyntheticElection:
+    """Generated teams, participants (email, team) and ballots (email, teams)"""
+
+    def __init__(self, teams, participants, ballots):
+        self.teams = teams
+        self.participants = participants
+        self.ballots = ballots
+
+    @property
+    def emails(self):
+        return [email for email, _ in self.participants]
+
+    def assignments(self):
+        """{email: team} for assigned participants"""
+        return {email: team for email, team in self.participants if team}
+
+def generate_election(participants, teams, votes, seed=42, unassigned_rate=0.03,
+                      size_shape=2.0, popularity_skew=1.1, picks=2):
+    """Generate N participants, T teams and up to V ballots deterministically"""
+    rng = random.Random(seed)
+    team_names = [f"팀 {i + 1}" for i in range(teams)]
+
+    # Uneven team sizes: gamma weights normalised into assignment probabilities
+    size_weights = [rng.gammavariate(size_shape, 1.0) for _ in team_names]
+
+    people = []
+    for i in range(participants):
+        email = f"student{i:06d}@example.com"
+        if rng.random() < unassigned_rate:
+            team = None
+        else:
+            team = rng.choices(team_names, weights=size_weights)[0]
+        people.append((email, team))
+
+    # Zipf-like popularity over a shuffled team order
+    ranking = team_names[:]
+    rng.shuffle(ranking)
+    popularity = {team: 1.0 / (rank + 1) ** popularity_skew for rank, team in enumerate(ranking)}
+
+    eligible = [(email, team) for email, team in people if team]
+    voters = rng.sample(eligible, min(votes, len(eligible)))
+
+    ballots = []
+    for email, own_team in voters:
+        candidates = [team for team in team_names if team != own_team]
+        weights = [popularity[team] for team in candidates]
+        choice = []
+        while len(choice) < min(picks, len(candidates)):
+            team = rng.choices(candidates, weights=weights)[0]
+            if team not in choice:
+                choice.append(team)
+        ballots.append((email, choice))
+
+    return SyntheticElection(team_names, people, ballots)
+
+def load_into_database(db, election, start=None, spread_minutes=60):
+    """Bulk-load a generated election into a DatabaseManager in a few statements"""
+    from utils.auth import hash_email
+    from utils.db_manager import Participant, Team, Vote, rebuild_pair_counts, rebuild_vote_counts
+
+    start = start or datetime.now() - timedelta(minutes=spread_minutes)
+    rng = random.Random(len(election.ballots))
+
+    db.clear_all_data()
+    db.session.execute(Team.__table__.delete())
+    db.session.execute(Team.__table__.insert(), [{"name": name, "created_at": start} for name in election.teams])
+    db.session.execute(Participant.__table__.insert(), [
+        {"email": email, "team": team, "voter_hash": hash_email(email), "created_at": start}
+        for email, team in election.participants
+    ])
+    if election.ballots:
+        db.session.execute(Vote.__table__.insert(), [
+            {
+                "email_hash": hash_email(email),
+                "selected_teams": json.dumps(teams, ensure_ascii=False),
+                "voted_at": start + timedelta(seconds=rng.uniform(0, spread_minutes * 60)),
+            }
+            for email, teams in election.ballots
+        ])
+    # Raw inserts skip the per-vote pair-count and vote-count updates
+    rebuild_pair_counts(db.session.connection())
+    rebuild_vote_counts(db.session.connection())
+    db.session.commit()
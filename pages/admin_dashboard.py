@@ -1,17 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
+from utils.exporter import EXPORT_FORMATS
+from utils import instrumentation, metrics, profiler
+from utils.profiler import page_timer
+from utils.ballots import BALLOT_TYPES, value_unit
 
 def render_admin_dashboard():
     """Render the admin dashboard"""
-    # Scroll to top on page load
-    st.markdown("""
-    <script>
-    window.scrollTo(0, 0);
-    </script>
-    """, unsafe_allow_html=True)
+    timer = page_timer("render_admin_dashboard")
     
     st.markdown("""
     <div class="main-header">
@@ -20,8 +17,10 @@ def render_admin_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
+    timer.lap("header_css")
+    
     # Top navigation
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         if st.button("👥 참여자 관리", use_container_width=True):
@@ -36,8 +35,12 @@ def render_admin_dashboard():
             st.session_state.admin_page = "voting"
     
     with col4:
+        if st.button("🛠️ 시스템 관리", use_container_width=True):
+            st.session_state.admin_page = "system"
+    
+    with col5:
         if st.button("📈 결과 공개", use_container_width=True):
-            st.session_state.data_manager.db.set_show_results(True)
+            st.session_state.data_manager.publish_results()
             st.session_state.show_results = True
             st.rerun()
     
@@ -46,6 +49,7 @@ def render_admin_dashboard():
         st.session_state.admin_page = "participants"
     
     st.markdown("---")
+    timer.lap("navigation")
     
     # Render selected page
     if st.session_state.admin_page == "participants":
@@ -54,6 +58,9 @@ def render_admin_dashboard():
         render_team_management()
     elif st.session_state.admin_page == "voting":
         render_voting_status()
+    elif st.session_state.admin_page == "system":
+        render_system_management()
+    timer.lap(f"page_{st.session_state.admin_page}")
     
     # Admin logout
     st.markdown("---")
@@ -66,6 +73,7 @@ def render_admin_dashboard():
 
 def render_participant_management():
     """Render participant management interface"""
+    timer = page_timer("render_participant_management")
     st.markdown("## 👥 참여자 관리")
     
     # Statistics
@@ -118,13 +126,7 @@ def render_participant_management():
                     st.warning("이메일을 입력해주세요.")
         
         with col2:
-            if st.button("📋 전체 복사"):
-                participants = st.session_state.data_manager.db.get_participants()
-                if participants:
-                    export_text = st.session_state.data_manager.export_participants()
-                    st.code(export_text, language="text")
-                else:
-                    st.info("등록된 참여자가 없습니다.")
+            render_export_download("participants", "csv", "📤 참여자 CSV 내보내기")
     
     # Individual participant management
     st.markdown("### 👤 개별 참여자 관리")
@@ -139,66 +141,55 @@ def render_participant_management():
             else:
                 st.error("이미 존재하거나 잘못된 이메일입니다.")
     
+    timer.lap("registration_forms")
+    
     # Participant list
-    participants = st.session_state.data_manager.db.get_participants()
-    if participants:
+    frame = st.session_state.data_manager.db.get_participant_frame()
+    timer.lap("db_participant_frame")
+    if not frame.empty:
         st.markdown("### 📋 등록된 참여자 목록")
         
-        # Create DataFrame for display
-        participant_data = []
-        all_teams = st.session_state.data_manager.db.get_teams()
+        team_options = ["미할당"] + list(frame["team"].cat.categories)
+        table = pd.DataFrame({
+            "이메일": frame["email"],
+            "팀": frame["team"].cat.add_categories("미할당").fillna("미할당").astype(str),
+            "투표 완료": frame["voted"],
+            "삭제": False
+        })
         
-        # participants is a dictionary from database manager
-        for email, info in participants.items():
-            team = info.get('team') or "미할당"
-            voted = "✅" if st.session_state.data_manager.has_voted(email) else "❌"
-            
-            participant_data.append({
-                "이메일": email,
-                "팀": team,
-                "투표 완료": voted
-            })
+        # Initialize a counter for resetting the editor after changes are applied
+        if 'participant_editor_counter' not in st.session_state:
+            st.session_state.participant_editor_counter = 0
         
-        df = pd.DataFrame(participant_data)
+        edited = st.data_editor(
+            table,
+            column_config={
+                "팀": st.column_config.SelectboxColumn("팀", options=team_options, required=True),
+                "투표 완료": st.column_config.CheckboxColumn("투표 완료"),
+                "삭제": st.column_config.CheckboxColumn("삭제", help="체크 후 적용하면 삭제됩니다")
+            },
+            disabled=["이메일", "투표 완료"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"participant_editor_{st.session_state.participant_editor_counter}"
+        )
+        timer.lap("participant_editor")
         
-        # Display with edit options
-        for idx, row in df.iterrows():
-            col1, col2, col3 = st.columns([3, 1, 1])
-            
-            with col1:
-                st.write(f"**{row['이메일']}**")
-                st.write(f"팀: {row['팀']} | 투표: {row['투표 완료']}")
+        to_delete = edited["삭제"]
+        changed = (edited["팀"] != table["팀"]) & ~to_delete
+        
+        if changed.any() or to_delete.any():
+            st.caption(f"팀 변경 {int(changed.sum())}명 | 삭제 {int(to_delete.sum())}명")
             
-            with col2:
-                # Team assignment
-                team_options = ["미할당"] + all_teams
-                current_team = row['팀'] if row['팀'] != "미할당" else "미할당"
-                
-                try:
-                    current_index = team_options.index(current_team)
-                except ValueError:
-                    current_index = 0
+            if st.button("💾 변경사항 적용", type="primary"):
+                new_teams = edited.loc[changed, "팀"]
+                new_teams = new_teams.astype(object).where(new_teams != "미할당", None)
                 
-                new_team = st.selectbox(
-                    "팀 변경",
-                    team_options,
-                    index=current_index,
-                    key=f"team_{idx}"
-                )
+                st.session_state.data_manager.db.assign_teams(dict(zip(edited.loc[changed, "이메일"], new_teams)))
+                st.session_state.data_manager.db.remove_participants(edited.loc[to_delete, "이메일"].tolist())
                 
-                if new_team != current_team:
-                    if new_team == "미할당":
-                        st.session_state.data_manager.db.assign_team(row['이메일'], None)
-                    else:
-                        st.session_state.data_manager.db.assign_team(row['이메일'], new_team)
-                    st.rerun()
-            
-            with col3:
-                if st.button("🗑️", key=f"delete_{idx}", help="삭제", use_container_width=True):
-                    st.session_state.data_manager.remove_participant(row['이메일'])
-                    st.rerun()
-            
-            st.markdown("---")
+                st.session_state.participant_editor_counter += 1
+                st.rerun()
     
     else:
         st.info("등록된 참여자가 없습니다.")
@@ -207,22 +198,17 @@ def render_team_management():
     """Render team management interface"""
     st.markdown("## 🏆 팀 관리")
     
-    # Team statistics
-    team_stats = st.session_state.data_manager.db.get_team_stats()
-    votes_data = st.session_state.data_manager.db.get_votes()
-    
-    # Calculate vote counts per team
-    vote_counts = {}
-    for vote in votes_data.values():
-        for team in vote.get("teams", []):
-            vote_counts[team] = vote_counts.get(team, 0) + 1
+    # Team statistics from one participant snapshot
+    frame = st.session_state.data_manager.db.get_participant_frame()
+    member_counts = frame["team"].value_counts(sort=False)
+    vote_counts = st.session_state.data_manager.db.get_results_data()["team_votes"]
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 📊 팀별 현황")
         
-        for team, member_count in team_stats["team_counts"].items():
+        for team, member_count in member_counts.items():
             vote_count = vote_counts.get(team, 0)
             st.metric(
                 f"{team}",
@@ -262,8 +248,7 @@ def render_team_management():
                 
                 with col3:
                     # Show team member count
-                    team_stats_data = st.session_state.data_manager.db.get_team_stats()
-                    member_count = team_stats_data["team_counts"].get(team, 0)
+                    member_count = int(member_counts.get(team, 0))
                     st.write(f"멤버: {member_count}명")
                     
                     # Show warning if last team
@@ -310,32 +295,37 @@ def render_team_management():
                     st.error("최소 1개의 팀은 있어야 합니다.")
     
     # Unassigned participants
-    unassigned = st.session_state.data_manager.get_unassigned_participants()
-    if unassigned:
+    unassigned = frame.loc[frame["team"].isna(), ["email"]]
+    if not unassigned.empty:
         st.markdown("### 🔄 미할당 참여자")
         st.warning(f"{len(unassigned)}명의 참여자가 팀에 할당되지 않았습니다.")
         
-        for email in unassigned:
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                st.write(f"**{email}**")
-            
-            with col2:
-                # Get current teams from database
-                current_teams = st.session_state.data_manager.db.get_teams()
-                selected_team = st.selectbox(
-                    "팀 할당",
-                    ["선택하세요"] + current_teams,
-                    key=f"assign_{email}"
-                )
-                
-                if selected_team != "선택하세요":
-                    st.session_state.data_manager.db.assign_team(email, selected_team)
-                    st.rerun()
+        if 'assign_editor_counter' not in st.session_state:
+            st.session_state.assign_editor_counter = 0
+        
+        assign_table = pd.DataFrame({"이메일": unassigned["email"], "팀 할당": None})
+        edited = st.data_editor(
+            assign_table,
+            column_config={
+                "팀 할당": st.column_config.SelectboxColumn("팀 할당", options=list(frame["team"].cat.categories))
+            },
+            disabled=["이메일"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"assign_editor_{st.session_state.assign_editor_counter}"
+        )
+        
+        selected = edited["팀 할당"].notna()
+        if selected.any() and st.button(f"✅ {int(selected.sum())}명 팀 할당", type="primary"):
+            st.session_state.data_manager.db.assign_teams(
+                dict(zip(edited.loc[selected, "이메일"], edited.loc[selected, "팀 할당"]))
+            )
+            st.session_state.assign_editor_counter += 1
+            st.rerun()
 
 def render_voting_status():
     """Render real-time voting status"""
+    timer = page_timer("render_voting_status")
     st.markdown("## 📊 실시간 투표 현황")
     
     # Auto-refresh every 5 seconds
@@ -359,34 +349,58 @@ def render_voting_status():
     # Progress bar
     progress = stats['total_voted'] / stats['total_participants'] if stats['total_participants'] > 0 else 0
     st.progress(progress)
+    timer.lap("db_stats")
+    
+    # Per-team turnout so organizers can nudge the teams that have not voted yet
+    turnout = st.session_state.data_manager.db.get_turnout_by_team()
+    if turnout:
+        st.markdown("### 👥 팀별 투표 현황")
+        df_turnout = pd.DataFrame([{
+            '팀': row['team'] or '미배정',
+            '인원': row['members'],
+            '투표 완료': row['voted'],
+            '미투표': row['pending'],
+            '투표율': row['voted'] / row['members'] * 100 if row['members'] else 0.0
+        } for row in turnout]).sort_values('미투표', ascending=False, kind='stable')
+        
+        st.dataframe(
+            df_turnout,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                '투표율': st.column_config.ProgressColumn('투표율', format='%.0f%%', min_value=0, max_value=100)
+            }
+        )
+    timer.lap("db_turnout")
+    
+    # Votes per minute since the first vote, to spot surges and size future events
+    timeline = st.session_state.data_manager.db.get_vote_timeline()
+    timer.lap("db_timeline")
+    if timeline:
+        from utils.charts import timeline_chart
+        
+        st.markdown("### ⏱️ 투표 추이")
+        peak_minute, peak_votes = max(timeline, key=lambda bucket: bucket[1])
+        st.caption(f"최대 분당 {peak_votes}표 ({peak_minute:%m/%d %H:%M}) · 첫 투표 {timeline[0][0]:%H:%M} · 최근 투표 {timeline[-1][0]:%H:%M}")
+        st.plotly_chart(timeline_chart(timeline, stats['total_participants']), use_container_width=True)
+        timer.lap("timeline_chart")
     
     st.markdown("---")
     
     # Voting results chart
     results_data = st.session_state.data_manager.db.get_results_data()
+    timer.lap("db_results")
     
     if results_data and results_data['sorted_results']:
-        # Create bar chart
-        teams = [team for team, votes in results_data['sorted_results']]
-        votes = [votes for team, votes in results_data['sorted_results']]
+        # Plotly is only loaded once an admin opens this tab
+        from utils.charts import status_chart
         
-        fig = px.bar(
-            x=teams,
-            y=votes,
-            title="팀별 득표 현황",
-            labels={'x': '팀', 'y': '득표수'},
-            color=votes,
-            color_continuous_scale='Viridis'
-        )
-        
-        fig.update_layout(
-            showlegend=False,
-            xaxis_title="팀",
-            yaxis_title="득표수",
-            font=dict(size=14)
-        )
+        # Built once per distinct tally and shared across reruns and sessions
+        fig = status_chart(results_data['sorted_results'])
+        timer.lap("bar_figure")
         
         st.plotly_chart(fig, use_container_width=True)
+        timer.lap("bar_chart")
         
         # Results table
         st.markdown("### 📋 상세 결과")
@@ -397,6 +411,7 @@ def render_voting_status():
         df.index = range(1, len(df) + 1)
         
         st.dataframe(df, use_container_width=True)
+        timer.lap("results_table")
         
         # Top teams highlight
         if len(results_data['sorted_results']) >= 2:
@@ -406,11 +421,11 @@ def render_voting_status():
             
             with col1:
                 first_team, first_votes = results_data['sorted_results'][0]
-                st.success(f"🥇 **1위: {first_team}** - {first_votes}표")
+                st.success(f"🥇 **1위: {first_team}** - {first_votes}{value_unit(results_data['ballot_type'])}")
             
             with col2:
                 second_team, second_votes = results_data['sorted_results'][1]
-                st.info(f"🥈 **2위: {second_team}** - {second_votes}표")
+                st.info(f"🥈 **2위: {second_team}** - {second_votes}{value_unit(results_data['ballot_type'])}")
     
     else:
         st.info("아직 투표가 진행되지 않았습니다.")
@@ -424,3 +439,187 @@ def render_voting_status():
         import time
         time.sleep(5)
         st.rerun()
+
+EXPORT_LABELS = {
+    "participants": "참여자",
+    "votes": "투표 (익명)",
+    "results": "결과",
+}
+
+def render_export_download(dataset, fmt, label):
+    """Prepare an export on click, then offer it as a download"""
+    state_key = f"export_{dataset}_{fmt}"
+    
+    if st.button(label, key=f"prepare_{state_key}"):
+        st.session_state[state_key] = st.session_state.data_manager.export_dataset(dataset, fmt)
+    
+    if st.session_state.get(state_key) is not None:
+        mime, extension = EXPORT_FORMATS[fmt]
+        st.download_button(
+            f"⬇️ {EXPORT_LABELS[dataset]} {extension.upper()} 다운로드",
+            data=st.session_state[state_key],
+            file_name=f"{dataset}_{datetime.now():%Y%m%d_%H%M%S}.{extension}",
+            mime=mime,
+            key=f"download_{state_key}"
+        )
+
+def render_system_management():
+    """Render election reset and snapshot interface"""
+    st.markdown("## 🛠️ 시스템 관리")
+    
+    data_manager = st.session_state.data_manager
+    
+    # Ballot type
+    st.markdown("### 🗳️ 투표 방식")
+    st.caption("첫 투표가 들어온 뒤에는 바꿀 수 없습니다.")
+    
+    current_type = data_manager.get_ballot_type()
+    ballot_type = st.selectbox(
+        "투표 방식",
+        list(BALLOT_TYPES),
+        index=list(BALLOT_TYPES).index(current_type),
+        format_func=BALLOT_TYPES.get
+    )
+    if st.button("💾 투표 방식 저장", disabled=ballot_type == current_type):
+        success, message = data_manager.set_ballot_type(ballot_type)
+        if success:
+            st.rerun()
+        else:
+            st.error(message)
+    
+    st.markdown("---")
+    
+    # Data exports
+    st.markdown("### 📤 데이터 내보내기")
+    st.caption("대용량 선거도 메모리 사용량이 일정하도록 나누어 생성합니다.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        dataset = st.selectbox("데이터", list(EXPORT_LABELS), format_func=EXPORT_LABELS.get)
+    with col2:
+        fmt = st.selectbox("형식", list(EXPORT_FORMATS), format_func=str.upper)
+    
+    render_export_download(dataset, fmt, "📦 내보내기 파일 생성")
+    
+    st.markdown("---")
+    
+    # Snapshot export
+    st.markdown("### 💾 스냅샷 내보내기")
+    st.caption("참여자, 팀, 투표, 설정 전체를 압축 파일로 저장합니다.")
+    
+    if st.button("📦 스냅샷 생성"):
+        st.session_state.snapshot_bytes = data_manager.export_snapshot()
+        st.session_state.snapshot_name = f"election_snapshot_{datetime.now():%Y%m%d_%H%M%S}.json.gz"
+    
+    if st.session_state.get('snapshot_bytes'):
+        st.download_button(
+            "⬇️ 스냅샷 다운로드",
+            data=st.session_state.snapshot_bytes,
+            file_name=st.session_state.snapshot_name,
+            mime="application/gzip"
+        )
+    
+    st.markdown("---")
+    
+    # Snapshot restore
+    st.markdown("### ♻️ 스냅샷 복원")
+    st.caption("현재 데이터를 모두 지우고 스냅샷 내용으로 교체합니다.")
+    
+    uploaded = st.file_uploader("스냅샷 파일", type=["gz"])
+    if uploaded is not None and st.button("♻️ 복원하기", type="primary"):
+        try:
+            data_manager.restore_snapshot(uploaded.getvalue())
+            st.success("스냅샷이 복원되었습니다.")
+            st.rerun()
+        except ValueError as e:
+            st.error(str(e))
+    
+    st.markdown("---")
+    
+    # Full reset
+    st.markdown("### 🧹 전체 초기화")
+    st.warning("모든 참여자, 팀, 투표 기록이 삭제됩니다. 되돌릴 수 없습니다.")
+    
+    confirm = st.checkbox("초기화에 동의합니다")
+    if st.button("🧹 전체 데이터 초기화", disabled=not confirm):
+        data_manager.clear_all_data()
+        st.session_state.pop('snapshot_bytes', None)
+        st.success("모든 데이터가 초기화되었습니다.")
+        st.rerun()
+    
+    st.markdown("---")
+    render_diagnostics()
+
+def render_diagnostics():
+    """Render query budget and render profiling diagnostics"""
+    render_query_diagnostics()
+    st.markdown("---")
+    render_profiling_diagnostics()
+    st.markdown("---")
+    
+    st.markdown("### 📈 메트릭")
+    st.caption("METRICS_PORT 설정 시 /metrics, METRICS_FILE 설정 시 파일로도 노출됩니다.")
+    with st.expander("Prometheus 텍스트 형식 보기"):
+        st.code(metrics.REGISTRY.render(), language="text")
+
+def render_profiling_diagnostics():
+    """Render rolling per-section render time percentiles"""
+    st.markdown("### ⏱️ 렌더 프로파일링")
+    st.caption(f"화면 렌더 함수의 구간별 소요 시간을 최근 {profiler.PROFILE_WINDOW}회 기준으로 집계합니다.")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        enabled = st.checkbox("렌더 프로파일링 활성화", value=profiler.is_enabled())
+        if enabled != profiler.is_enabled():
+            profiler.set_enabled(enabled)
+            st.rerun()
+    with col2:
+        if st.button("🧽 초기화", key="reset_profiler"):
+            profiler.reset()
+            st.rerun()
+    
+    stats = profiler.get_section_stats()
+    if not stats:
+        st.info("수집된 프로파일링 데이터가 없습니다.")
+        return
+    
+    table = pd.DataFrame(stats)
+    table.columns = ["구간", "횟수", "p50(ms)", "p95(ms)", "p99(ms)"]
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+def render_query_diagnostics():
+    """Render per-rerun query budget diagnostics"""
+    st.markdown("### 🩺 쿼리 진단")
+    st.caption(f"각 화면 갱신(rerun)마다 실행된 SQL 수와 시간을 집계합니다. "
+               f"{instrumentation.SLOW_QUERY_MS:.0f}ms 이상은 느린 쿼리로 기록됩니다.")
+    
+    enabled = st.checkbox("쿼리 계측 활성화", value=instrumentation.is_enabled())
+    if enabled != instrumentation.is_enabled():
+        instrumentation.set_enabled(enabled)
+        st.rerun()
+    
+    reports = instrumentation.get_recent_reports()
+    if not reports:
+        st.info("수집된 계측 데이터가 없습니다.")
+        return
+    
+    summary = pd.DataFrame([{
+        "시각": report["started_at"],
+        "화면": report["label"],
+        "쿼리 수": report["statements"],
+        "쿼리 시간(ms)": report["query_ms"],
+        "rerun 시간(ms)": report["rerun_ms"],
+        "느린 쿼리": len(report["slow_queries"])
+    } for report in reports])
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+    
+    latest = reports[0]
+    with st.expander(f"최근 rerun 상세 ({latest['started_at']}, {latest['statements']}개 쿼리)"):
+        callers = pd.DataFrame(latest["callers"])
+        if not callers.empty:
+            callers.columns = ["렌더 함수", "DB 메서드", "쿼리 수", "시간(ms)"]
+            st.dataframe(callers, use_container_width=True, hide_index=True)
+        
+        if latest["slow_queries"]:
+            st.markdown("**느린 쿼리**")
+            st.dataframe(pd.DataFrame(latest["slow_queries"]), use_container_width=True, hide_index=True)
@@ -1,14 +1,12 @@
 import streamlit as st
 from utils.auth import verify_admin, is_valid_email, get_user_team
+from utils.profiler import page_timer
+from utils.metrics import LOGIN_ATTEMPTS
+from utils.admission import ADMISSION, admission_ticket, render_waiting_room
 
 def render_auth_page():
     """Render the authentication page"""
-    # Scroll to top on page load
-    st.markdown("""
-    <script>
-    window.scrollTo(0, 0);
-    </script>
-    """, unsafe_allow_html=True)
+    timer = page_timer("render_auth_page")
     
     st.markdown("""
     <div class="main-header">
@@ -20,6 +18,8 @@ def render_auth_page():
     </div>
     """, unsafe_allow_html=True)
     
+    timer.lap("header_css")
+    
     # Create enhanced tab layout with better mobile design
     st.markdown("---")
     
@@ -41,12 +41,20 @@ def render_auth_page():
             st.rerun()
     
     st.markdown('<hr style="margin: 0.5rem 0;">', unsafe_allow_html=True)
+    timer.lap("mode_buttons")
     
     # Render appropriate login form based on selection
     if st.session_state.auth_mode == "student":
         render_student_login()
     else:
         render_admin_login()
+    timer.lap(f"{st.session_state.auth_mode}_login_form")
+    
+    # Served from the process-wide settings cache, so checking on every rerun is free
+    if st.session_state.data_manager.db.get_show_results():
+        st.markdown("---")
+        render_quick_access()
+        timer.lap("quick_access")
     
     # Footer
     st.markdown("---")
@@ -57,6 +65,7 @@ def render_auth_page():
         <p>팀 프로젝트 발표 투표 시스템</p>
     </div>
     """, unsafe_allow_html=True)
+    timer.lap("footer")
 
 def render_student_login():
     """Render student login interface"""
@@ -81,27 +90,27 @@ def render_student_login():
         
         submit_button = st.form_submit_button("🗳️ 투표 참여하기", use_container_width=True)
             
+        # A login waiting for admission retries with the email it was submitted with
+        if not submit_button and st.session_state.get('pending_login'):
+            email = st.session_state.pending_login
+            submit_button = True
+        
         if submit_button:
             if not email:
+                LOGIN_ATTEMPTS.inc(role="student", outcome="empty")
                 st.error("이메일을 입력해주세요.")
             elif not is_valid_email(email):
+                LOGIN_ATTEMPTS.inc(role="student", outcome="invalid_email")
                 st.error("올바른 이메일 형식을 입력해주세요.")
-            elif not st.session_state.data_manager.is_email_registered(email):
-                st.error("등록되지 않은 이메일입니다. 관리자에게 문의하세요.")
-            elif st.session_state.data_manager.has_voted(email):
-                st.warning("이미 투표를 완료하셨습니다.")
+            elif not ADMISSION.admit(admission_ticket()):
+                st.session_state.pending_login = email
+                render_waiting_room("접속자가 많아 로그인 대기 중입니다.")
             else:
-                # Successful login
-                user_team = get_user_team(email, st.session_state.data_manager)
-                
-                st.session_state.is_authenticated = True
-                st.session_state.user_email = email
-                st.session_state.user_role = 'student'
-                st.session_state.user_team = user_team
-                st.session_state.current_page = 'voting'
-                
-                st.success(f"✅ 로그인 성공! {user_team if user_team else '미할당'} 팀으로 인증되었습니다.")
-                st.rerun()
+                st.session_state.pop('pending_login', None)
+                try:
+                    login_student(email)
+                finally:
+                    ADMISSION.release()
         
     # Instructions
     st.markdown("---")
@@ -114,6 +123,33 @@ def render_student_login():
     - 투표 완료 후 결과는 발표 시간에 공개됩니다
     """)
 
+def login_student(email):
+    """Check registration and load the voting context for an admitted login"""
+    if not st.session_state.data_manager.is_email_registered(email):
+        LOGIN_ATTEMPTS.inc(role="student", outcome="unregistered")
+        st.error("등록되지 않은 이메일입니다. 관리자에게 문의하세요.")
+    else:
+        context = st.session_state.data_manager.get_voting_context(email)
+        
+        if context["voted"]:
+            LOGIN_ATTEMPTS.inc(role="student", outcome="already_voted")
+            st.warning("이미 투표를 완료하셨습니다.")
+        else:
+            LOGIN_ATTEMPTS.inc(role="student", outcome="success")
+            
+            # Successful login; the voting page reuses this context until the vote or a team change
+            user_team = context["team"]
+            st.session_state.voting_context = context
+            
+            st.session_state.is_authenticated = True
+            st.session_state.user_email = email
+            st.session_state.user_role = 'student'
+            st.session_state.user_team = user_team
+            st.session_state.current_page = 'voting'
+            
+            st.success(f"✅ 로그인 성공! {user_team if user_team else '미할당'} 팀으로 인증되었습니다.")
+            st.rerun()
+
 def render_admin_login():
     """Render admin login interface"""
     st.markdown("### 👨‍💼 관리자 로그인")
@@ -147,12 +183,17 @@ def render_admin_login():
             
             if admin_submit:
                 if not admin_email or not admin_password:
+                    LOGIN_ATTEMPTS.inc(role="admin", outcome="empty")
                     st.error("이메일과 비밀번호를 모두 입력해주세요.")
                 elif not is_valid_email(admin_email):
+                    LOGIN_ATTEMPTS.inc(role="admin", outcome="invalid_email")
                     st.error("올바른 이메일 형식을 입력해주세요.")
                 elif not verify_admin(admin_email, admin_password):
+                    LOGIN_ATTEMPTS.inc(role="admin", outcome="rejected")
                     st.error("관리자 인증에 실패했습니다. 이메일과 비밀번호를 확인해주세요.")
                 else:
+                    LOGIN_ATTEMPTS.inc(role="admin", outcome="success")
+                    
                     # Successful admin login
                     st.session_state.is_authenticated = True
                     st.session_state.user_email = admin_email
@@ -1,16 +1,12 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
+from utils.profiler import page_timer
+from utils.charts import snapshot_chart
+from utils.ballots import BALLOT_TYPES, value_unit
 
 def render_results_display():
     """Render the public results display"""
-    # Scroll to top on page load
-    st.markdown("""
-    <script>
-    window.scrollTo(0, 0);
-    </script>
-    """, unsafe_allow_html=True)
+    timer = page_timer("render_results_display")
     
     # Emergency exit button at the top
     col1, col2, col3 = st.columns([1, 3, 1])
@@ -30,6 +26,12 @@ def render_results_display():
                 st.session_state.show_results = False
                 st.rerun()
     
+    # Only admins may preview results before they are published
+    if st.session_state.user_role != 'admin' and not st.session_state.data_manager.db.get_show_results():
+        st.info("아직 결과가 공개되지 않았습니다. 발표가 모두 끝난 후 다시 확인해주세요.")
+        timer.lap("unpublished")
+        return
+    
     st.markdown("""
     <div class="main-header">
         <div class="brand-title">🏆 투표 결과 발표</div>
@@ -40,9 +42,22 @@ def render_results_display():
     </div>
     """, unsafe_allow_html=True)
     
-    # Get results data
-    results_data = st.session_state.data_manager.db.get_results_data()
-    stats = st.session_state.data_manager.db.get_voting_stats()
+    timer.lap("header_css")
+    
+    # Served from the snapshot frozen at publication time, not a live tally
+    snapshot = st.session_state.data_manager.get_results_snapshot()
+    stats = snapshot['stats']
+    ranked = snapshot['results']
+    total_received_votes = snapshot['total_received_votes']
+    # Snapshots published before ballot types existed are two-team ballots
+    ballot_type = snapshot.get('ballot_type', 'pick_two')
+    unit = value_unit(ballot_type)
+    timer.lap("db_results")
+    
+    if snapshot['version'] is not None:
+        st.caption(f"📌 {snapshot['published_at'].replace('T', ' ')} 기준 집계 (v{snapshot['version']}) · {BALLOT_TYPES[ballot_type]}")
+    elif st.session_state.user_role == 'admin':
+        st.caption("📌 아직 공개되지 않은 실시간 집계입니다")
     
     # Overall statistics
     col1, col2, col3, col4 = st.columns(4)
@@ -57,17 +72,15 @@ def render_results_display():
         st.metric("투표율", f"{stats['participation_rate']:.1f}%")
     
     with col4:
-        total_received_votes = sum(results_data['team_votes'].values()) if results_data else 0
-        st.metric("총 득표수", total_received_votes)
+        st.metric("총 득점" if ballot_type == "score" else "총 득표수", total_received_votes)
     
     st.markdown("---")
+    timer.lap("metrics")
     
     # Check if there are any actual votes
-    if results_data and total_received_votes > 0:
-        sorted_results = results_data['sorted_results']
-        
+    if total_received_votes > 0:
         # Winner announcement
-        if len(sorted_results) >= 2:
+        if len(ranked) >= 2:
             st.markdown("## 🎉 우승팀 발표")
             
             col1, col2 = st.columns(2)
@@ -77,9 +90,9 @@ def render_results_display():
                 <div style="background: linear-gradient(135deg, #FFD700, #FFA500); 
                            color: white; padding: 2rem; border-radius: 15px; 
                            text-align: center; margin: 1rem 0;">
-                    <h2>🥇 1위</h2>
-                    <h1>{sorted_results[0][0]}</h1>
-                    <h2>{sorted_results[0][1]}표</h2>
+                    <h2>🥇 {ranked[0]['rank']}위</h2>
+                    <h1>{ranked[0]['team']}</h1>
+                    <h2>{ranked[0]['votes']}{unit}</h2>
                 </div>
                 """, unsafe_allow_html=True)
             
@@ -88,53 +101,23 @@ def render_results_display():
                 <div style="background: linear-gradient(135deg, #C0C0C0, #A0A0A0); 
                            color: white; padding: 2rem; border-radius: 15px; 
                            text-align: center; margin: 1rem 0;">
-                    <h2>🥈 2위</h2>
-                    <h1>{sorted_results[1][0]}</h1>
-                    <h2>{sorted_results[1][1]}표</h2>
+                    <h2>🥈 {ranked[1]['rank']}위</h2>
+                    <h1>{ranked[1]['team']}</h1>
+                    <h2>{ranked[1]['votes']}{unit}</h2>
                 </div>
                 """, unsafe_allow_html=True)
         
-        # Detailed results chart
-        st.markdown("## 📊 전체 결과")
+        timer.lap("winner_cards")
         
-        # Create a simple and reliable bar chart using plotly express
-        teams = [r[0] for r in sorted_results]
-        votes = [r[1] for r in sorted_results]
-        
-        # Create DataFrame for plotly express
-        chart_df = pd.DataFrame({
-            '팀': teams,
-            '득표수': votes
-        })
-        
-        # Create bar chart with plotly express (more stable)
-        fig = px.bar(
-            chart_df,
-            x='팀',
-            y='득표수',
-            title="팀별 최종 득표 결과",
-            color='득표수',
-            color_continuous_scale=['#33BB66', '#FFD700'],
-            text='득표수'
-        )
-        
-        fig.update_layout(
-            title_x=0.5,
-            font=dict(size=14),
-            height=500,
-            showlegend=False
-        )
-        
-        fig.update_traces(textposition='outside')
-        
-        st.plotly_chart(fig, use_container_width=True)
+        # Detailed results chart (figure spec stored with the snapshot)
+        st.markdown("## 📊 전체 결과")
+        st.plotly_chart(snapshot_chart(snapshot, 'bar'), use_container_width=True)
+        timer.lap("bar_chart")
         
         # Results table
         st.markdown("## 📋 상세 순위")
         
-        # Create DataFrame from sorted results
-        df_data = [{'팀명': team, '득표수': votes} for team, votes in sorted_results]
-        df = pd.DataFrame(df_data)
+        df = pd.DataFrame([{'팀명': row['team'], '득표수': row['votes']} for row in ranked])
         df.index = range(1, len(df) + 1)
         
         # Style the dataframe
@@ -143,41 +126,57 @@ def render_results_display():
                                             else 'background-color: #F0F8F5' for _ in x], axis=1)
         
         st.dataframe(styled_df, use_container_width=True)
+        timer.lap("styled_table")
         
-        # Percentage breakdown
-        st.markdown("## 📈 득표율 분석")
-        
-        # Pie chart
-        fig_pie = px.pie(
-            values=votes,
-            names=teams,
-            title="팀별 득표율",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
+        if snapshot.get('rounds'):
+            # Instant-runoff: one column per round, blank once a team is eliminated
+            st.markdown("## 🔁 라운드별 집계")
+            df_rounds = pd.DataFrame(
+                {f"{number}라운드": counts for number, counts in enumerate(snapshot['rounds'], 1)}
+            ).reindex([row['team'] for row in ranked])
+            st.dataframe(df_rounds, use_container_width=True)
+            timer.lap("rounds_table")
         
-        fig_pie.update_layout(
-            title=dict(
-                font=dict(size=20),
-                x=0.5
-            ),
-            font=dict(size=14)
-        )
+        pairwise = snapshot.get('pairwise')
+        if pairwise and len(pairwise['copeland']) >= 2:
+            # Head-to-head view: a team beats another if more voters preferred it
+            st.markdown("## 🤝 맞대결 순위 (Copeland)")
+            if pairwise['condorcet_winner']:
+                st.success(f"🏅 **{pairwise['condorcet_winner']}** 팀이 다른 모든 팀과의 맞대결에서 이겼습니다 (콩도르세 승자)")
+            
+            df_copeland = pd.DataFrame([{
+                '팀명': row['team'],
+                '승': row['wins'],
+                '무': row['ties'],
+                '패': row['losses'],
+                '점수': row['score']
+            } for row in pairwise['copeland']])
+            df_copeland.index = range(1, len(df_copeland) + 1)
+            st.dataframe(df_copeland, use_container_width=True)
+            
+            if pairwise['pairs']:
+                st.markdown("### 👥 자주 함께 선택된 팀")
+                st.dataframe(pd.DataFrame([{
+                    '팀 조합': ' + '.join(pair['teams']),
+                    '함께 선택': pair['together'],
+                    '전체 투표 대비': f"{pair['share']:.1f}%"
+                } for pair in pairwise['pairs']]), use_container_width=True, hide_index=True)
+            timer.lap("pairwise_tables")
         
-        st.plotly_chart(fig_pie, use_container_width=True)
+        # Percentage breakdown
+        st.markdown("## 📈 득표율 분석")
+        st.plotly_chart(snapshot_chart(snapshot, 'pie'), use_container_width=True)
+        timer.lap("pie_chart")
         
         # Percentage table
-        percentage_data = []
-        for i, (team, votes_count) in enumerate(sorted_results):
-            percentage = (votes_count / total_received_votes) * 100 if total_received_votes > 0 else 0
-            percentage_data.append({
-                '순위': i + 1,
-                '팀명': team,
-                '득표수': votes_count,
-                '득표율': f"{percentage:.1f}%"
-            })
-        
-        df_percentage = pd.DataFrame(percentage_data)
+        df_percentage = pd.DataFrame([{
+            '순위': row['rank'],
+            '팀명': row['team'],
+            '득표수': row['votes'],
+            '득표율': f"{row['percentage']:.1f}%"
+        } for row in ranked])
         st.dataframe(df_percentage, use_container_width=True)
+        timer.lap("percentage_table")
         
         # Congratulations message with votes
         st.markdown("---")
@@ -215,12 +214,14 @@ def render_results_display():
         """, unsafe_allow_html=True)
         
         # Show current teams
-        teams = st.session_state.data_manager.db.get_teams()
+        teams = [row['team'] for row in ranked]
         if teams:
             st.markdown("### 📋 등록된 팀 목록")
             for i, team in enumerate(teams, 1):
                 st.write(f"{i}. **{team}**")
     
+    timer.lap("body")
+    
     # Navigation controls - always show for anyone who can access results
     st.markdown("---")
     st.markdown("### 🔧 페이지 제어")
@@ -246,6 +247,10 @@ def render_results_display():
             if st.button("🏠 관리자 대시보드", use_container_width=True):
                 st.session_state.show_results = False
                 st.rerun()
+        
+        if st.button("🔁 최신 집계로 다시 공개", use_container_width=True):
+            st.session_state.data_manager.publish_results()
+            st.rerun()
     
     # Auto-refresh for live updates
     if st.checkbox("실시간 업데이트 (10초마다)"):
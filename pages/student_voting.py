@@ -1,33 +1,171 @@
 import streamlit as st
-from utils.auth import hash_email
+from utils.profiler import page_timer
+from utils.admission import ADMISSION, admission_ticket, render_waiting_room
+from utils.ballots import MAX_SCORE
+
+# Header subtitle and first instruction line per ballot type
+BALLOT_GUIDES = {
+    "pick_two": ("최고의 팀 2곳을 선택해주세요!", "**1인 2표**: 각자 2개의 팀을 선택할 수 있습니다"),
+    "approval": ("좋았던 팀을 모두 선택해주세요!", "**찬성 투표**: 좋았던 팀을 원하는 만큼 선택할 수 있습니다"),
+    "score": (f"팀마다 0~{MAX_SCORE}점을 매겨주세요!", f"**점수 투표**: 팀마다 0~{MAX_SCORE}점을 주고, 총점으로 순위를 정합니다"),
+    "ranked": ("좋았던 순서대로 팀을 골라주세요!", "**선호 순위 투표**: 최하위 팀을 차례로 탈락시키며 표를 다음 순위로 옮겨 과반 팀을 정합니다"),
+}
+
+def team_changed_notice(old_team, new_team):
+    """Explain why the team list changed under the student"""
+    return (f"소속 팀이 '{old_team or '미배정'}'에서 '{new_team or '미배정'}'(으)로 변경되어 "
+            "투표 가능한 팀 목록을 새로 불러왔습니다. 다시 선택해주세요.")
+
+def get_voting_context(user_email):
+    """Per-session voting context, reloaded for a new user, team list, team assignment or ballot type"""
+    data_manager = st.session_state.data_manager
+    context = st.session_state.get('voting_context')
+    # The versions and ballot_type come from the process-wide settings cache, not a query
+    if (context is None or context["email"] != user_email
+            or context["teams_version"] != data_manager.db.get_teams_version()
+            or context.get("participants_version") != data_manager.db.get_participants_version()
+            or context["ballot_type"] != data_manager.db.get_ballot_type()):
+        previous = context if context is not None and context["email"] == user_email else None
+        context = data_manager.get_voting_context(user_email)
+        st.session_state.voting_context = context
+        if previous is not None and previous["team"] != context["team"]:
+            st.session_state.voting_notice = team_changed_notice(previous["team"], context["team"])
+    return context
+
+def render_pick_two_inputs(available_teams, user_email):
+    """Checkbox grid for the original two-team ballot; returns (ballot, ready, button text, help)"""
+    # Initialize selected teams in session state
+    if f'selected_teams_{user_email}' not in st.session_state:
+        st.session_state[f'selected_teams_{user_email}'] = []
+    
+    # Display teams with modern card-based selection
+    selected_teams = []
+    
+    st.markdown("### 🎯 투표할 팀을 선택하세요")
+    st.markdown("**2개의 팀을 선택해주세요**")
+    
+    # Create a grid layout for team cards
+    for i, team in enumerate(available_teams):
+        is_selected = st.checkbox(
+            f"**{team}**", 
+            key=f"team_{team}_{user_email}",
+            label_visibility="visible"
+        )
+        if is_selected:
+            selected_teams.append(team)
+            
+        # Add minimal visual spacing for mobile
+        if i < len(available_teams) - 1:
+            st.markdown('<div style="margin: 0.1rem 0;"></div>', unsafe_allow_html=True)
+    
+    # Update session state
+    st.session_state[f'selected_teams_{user_email}'] = selected_teams
+    
+    st.markdown("---")
+    
+    # Show selection status with enhanced visual feedback
+    selection_count = len(selected_teams)
+    
+    st.markdown("---")
+    
+    if selection_count == 0:
+        st.info("💡 **투표할 팀을 선택해주세요**")
+    elif selection_count == 1:
+        st.warning(f"⚠️ **1개 더 선택해주세요** (현재: {selected_teams[0]})")
+    elif selection_count == 2:
+        st.success(f"✅ **투표 준비 완료!**")
+        st.markdown("**선택된 팀:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"✅ **{selected_teams[0]}**")
+        with col2:
+            st.markdown(f"✅ **{selected_teams[1]}**")
+    else:
+        st.error("❌ **2개만 선택 가능합니다!** 일부 선택을 해제해주세요.")
+    
+    # Enhanced submit button with better UX
+    if selection_count == 2:
+        button_text = "🗳️ 투표 제출하기"
+        button_help = "선택한 2개 팀에 투표합니다"
+    else:
+        button_text = f"🗳️ 투표 제출 ({selection_count}/2)"
+        button_help = "정확히 2개 팀을 선택해야 투표할 수 있습니다"
+    
+    return selected_teams, selection_count == 2, button_text, button_help
+
+def render_ballot_inputs(ballot_type, available_teams, user_email):
+    """Inputs for approval, score and ranked ballots; returns (ballot, ready, button text, help)"""
+    st.markdown("### 🎯 투표할 팀을 선택하세요")
+    
+    if ballot_type == "ranked":
+        st.markdown("**좋았던 순서대로 선택해주세요** (먼저 고른 팀이 1순위)")
+        ballot = st.multiselect(
+            "선호 순위",
+            available_teams,
+            key=f"ranked_{user_email}",
+            placeholder="팀을 순서대로 선택하세요"
+        )
+        for rank, team in enumerate(ballot, 1):
+            st.markdown(f"**{rank}순위** · {team}")
+        empty_help = "1개 이상의 팀을 선택해야 투표할 수 있습니다"
+    elif ballot_type == "score":
+        st.markdown(f"**팀마다 0~{MAX_SCORE}점을 매겨주세요**")
+        scores = {
+            team: st.slider(f"**{team}**", 0, MAX_SCORE, 0, key=f"score_{team}_{user_email}")
+            for team in available_teams
+        }
+        # Zero scores are left out; the tally treats a missing team as 0
+        ballot = {team: score for team, score in scores.items() if score > 0}
+        empty_help = "1점 이상을 준 팀이 하나 이상 있어야 투표할 수 있습니다"
+    else:
+        st.markdown("**좋았던 팀을 모두 선택해주세요**")
+        ballot = [
+            team for team in available_teams
+            if st.checkbox(f"**{team}**", key=f"team_{team}_{user_email}")
+        ]
+        empty_help = "1개 이상의 팀을 선택해야 투표할 수 있습니다"
+    
+    st.markdown("---")
+    
+    if ballot:
+        st.success(f"✅ **투표 준비 완료!** ({len(ballot)}개 팀)")
+        return ballot, True, "🗳️ 투표 제출하기", "선택한 내용으로 투표합니다"
+    
+    st.info("💡 **투표할 팀을 선택해주세요**")
+    return ballot, False, "🗳️ 투표 제출", empty_help
 
 def render_student_voting():
     """Render the student voting interface"""
-    # Scroll to top on page load
-    st.markdown("""
-    <script>
-    window.scrollTo(0, 0);
-    </script>
-    """, unsafe_allow_html=True)
+    timer = page_timer("render_student_voting")
+    
+    # User info
+    user_email = st.session_state.user_email
+    context = get_voting_context(user_email)
+    user_team = context["team"]
+    subtitle, ballot_instruction = BALLOT_GUIDES[context["ballot_type"]]
     
-    st.markdown("""
+    st.markdown(f"""
     <div class="main-header">
         <div class="brand-title">🗳️ 팀 프로젝트 투표</div>
-        <div class="brand-subtitle">최고의 팀 2곳을 선택해주세요!</div>
+        <div class="brand-subtitle">{subtitle}</div>
     </div>
     """, unsafe_allow_html=True)
     
-    # User info
-    user_email = st.session_state.user_email
-    user_team = st.session_state.user_team
+    timer.lap("header_css")
     
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
         st.markdown("### 👋 투표 참여")
         
+        notice = st.session_state.pop('voting_notice', None)
+        if notice:
+            st.warning(notice)
+        
+        timer.lap("voting_context")
+        
         # Check if user has already voted - show completion page only
-        if st.session_state.data_manager.has_voted(user_email):
+        if context["voted"]:
             # Show only completion message and logout - no other content
             st.markdown("""
             <div class="success-message">
@@ -47,6 +185,11 @@ def render_student_voting():
             # Single logout button centered
             col1, col2, col3 = st.columns([1, 1, 1])
             with col2:
+                if st.session_state.data_manager.db.get_show_results():
+                    if st.button("📊 투표 결과 보기", use_container_width=True, key="already_voted_results"):
+                        st.session_state.show_results = True
+                        st.rerun()
+                
                 if st.button("🚪 로그아웃하고 메인으로", type="primary", use_container_width=True, key="already_voted_logout"):
                     st.session_state.is_authenticated = False
                     st.session_state.user_email = None
@@ -89,11 +232,11 @@ def render_student_voting():
         
         st.markdown("---")
         
-        # Get available teams (excluding user's team)
-        all_teams = st.session_state.data_manager.db.get_teams()
-        available_teams = [team for team in all_teams if team != user_team]
+        # Available teams (excluding user's team) were computed with the context
+        available_teams = context["available_teams"]
         
-        if len(available_teams) < 2:
+        # Only the two-team ballot needs two teams to choose from
+        if len(available_teams) < (2 if context["ballot_type"] == "pick_two" else 1):
             st.error("투표 가능한 팀이 부족합니다. 관리자에게 문의하세요.")
             
             # Logout button for insufficient teams
@@ -108,79 +251,45 @@ def render_student_voting():
                     st.rerun()
             return
         
-        # Remove this duplicate section since we moved it above
-        
-        # Initialize selected teams in session state
-        if f'selected_teams_{user_email}' not in st.session_state:
-            st.session_state[f'selected_teams_{user_email}'] = []
-        
-        # Display teams with modern card-based selection
-        selected_teams = []
-        
-        st.markdown("### 🎯 투표할 팀을 선택하세요")
-        st.markdown("**2개의 팀을 선택해주세요**")
-        
-        # Create a grid layout for team cards
-        for i, team in enumerate(available_teams):
-            is_selected = st.checkbox(
-                f"**{team}**", 
-                key=f"team_{team}_{user_email}",
-                label_visibility="visible"
-            )
-            if is_selected:
-                selected_teams.append(team)
-                
-            # Add minimal visual spacing for mobile
-            if i < len(available_teams) - 1:
-                st.markdown('<div style="margin: 0.1rem 0;"></div>', unsafe_allow_html=True)
-        
-        # Update session state
-        st.session_state[f'selected_teams_{user_email}'] = selected_teams
-        
-        st.markdown("---")
-        
-        # Show selection status with enhanced visual feedback
-        selection_count = len(selected_teams)
-        
-        st.markdown("---")
-        
-        if selection_count == 0:
-            st.info("💡 **투표할 팀을 선택해주세요**")
-        elif selection_count == 1:
-            st.warning(f"⚠️ **1개 더 선택해주세요** (현재: {selected_teams[0]})")
-        elif selection_count == 2:
-            st.success(f"✅ **투표 준비 완료!**")
-            st.markdown("**선택된 팀:**")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(f"✅ **{selected_teams[0]}**")
-            with col2:
-                st.markdown(f"✅ **{selected_teams[1]}**")
-        else:
-            st.error("❌ **2개만 선택 가능합니다!** 일부 선택을 해제해주세요.")
-        
-        # Enhanced submit button with better UX
-        vote_button_disabled = selection_count != 2
-        
-        if selection_count == 2:
-            button_text = "🗳️ 투표 제출하기"
-            button_help = "선택한 2개 팀에 투표합니다"
+        if context["ballot_type"] == "pick_two":
+            ballot, ready, button_text, button_help = render_pick_two_inputs(available_teams, user_email)
         else:
-            button_text = f"🗳️ 투표 제출 ({selection_count}/2)"
-            button_help = "정확히 2개 팀을 선택해야 투표할 수 있습니다"
+            ballot, ready, button_text, button_help = render_ballot_inputs(context["ballot_type"], available_teams, user_email)
+        timer.lap("team_checkboxes")
         
-        if st.button(
+        submit_vote = st.button(
             button_text,
             type="primary", 
             use_container_width=True,
-            disabled=vote_button_disabled,
+            disabled=not ready,
             help=button_help,
             key="submit_vote"
-        ):
-            if selection_count == 2:
-                success, message = st.session_state.data_manager.cast_vote(user_email, selected_teams)
+        )
+        
+        # A vote waiting for admission retries with the teams it was submitted with
+        if not submit_vote and st.session_state.get('pending_vote'):
+            ballot = st.session_state.pending_vote
+            ready = True
+            submit_vote = True
+        
+        if submit_vote:
+            if ready:
+                if not ADMISSION.admit(admission_ticket()):
+                    st.session_state.pending_vote = ballot
+                    render_waiting_room("투표 제출 대기 중입니다.")  # reruns, never returns
+                
+                st.session_state.pop('pending_vote', None)
+                try:
+                    success, message = st.session_state.data_manager.cast_vote(
+                        user_email, ballot, user_team=context["team"]
+                    )
+                finally:
+                    ADMISSION.release()
                 
                 if success:
+                    # No need to ask the database again on the completion page
+                    context["voted"] = True
+                    
                     # Clear the selection from session state
                     if f'selected_teams_{user_email}' in st.session_state:
                         del st.session_state[f'selected_teams_{user_email}']
@@ -191,21 +300,29 @@ def render_student_voting():
                     # Force page refresh to show completion state
                     st.rerun()
                 else:
+                    # E.g. a vote from another tab or a team reassigned moments ago
+                    fresh = st.session_state.data_manager.get_voting_context(user_email)
+                    st.session_state.voting_context = fresh
+                    if fresh["team"] != context["team"]:
+                        st.session_state.voting_notice = team_changed_notice(context["team"], fresh["team"])
+                        st.rerun()
                     st.error(message)
             else:
-                st.error("정확히 2개의 팀을 선택해주세요.")
+                st.error(button_help)
+        timer.lap("selection_status")
         
         # Show voting instructions only if not voted
-        if not st.session_state.data_manager.has_voted(user_email):
+        if not context["voted"]:
             st.markdown("---")
             st.markdown("### 📋 투표 안내")
-            st.markdown("""
-            - **1인 2표**: 각자 2개의 팀을 선택할 수 있습니다
+            st.markdown(f"""
+            - {ballot_instruction}
             - **익명성 보장**: 개인 정보는 저장되지 않습니다
             - **본인 팀 제외**: 본인이 속한 팀은 선택할 수 없습니다
             - **중복 투표 불가**: 한 번 투표하면 수정할 수 없습니다
             - **공정한 평가**: 모든 투표는 동일한 가중치를 가집니다
             """)
+            timer.lap("instructions")
             
             # Emergency logout
             st.markdown("---")
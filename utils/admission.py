@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import streamlit as st
+from utils.metrics import REGISTRY, Counter, Gauge
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        """Whole tokens available right now"""
+        self._refill()
+        return int(self.tokens)
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+class AdmissionController:
+    """Token bucket plus concurrency cap in front of DB-heavy actions, with a FIFO waiting room.
+
+    Sessions that are not admitted keep their ticket in the queue and retry;
+    a ticket is admitted once it is within the first N waiters, where N is
+    the capacity available right now. Tickets that stop retrying expire.
+    """
+
+    def __init__(self, rate, burst, max_concurrent, ticket_ttl=10.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrent = max_concurrent
+        self.ticket_ttl = ticket_ttl
+        self.active = 0
+        self._waiting = OrderedDict()  # ticket -> last seen (monotonic)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.bucket.rate > 0 and self.max_concurrent > 0
+
+    def _expire(self, now):
+        while self._waiting:
+            ticket, last_seen = next(iter(self._waiting.items()))
+            if now - last_seen < self.ticket_ttl:
+                break
+            del self._waiting[ticket]
+
+    def admit(self, ticket):
+        """Try to start an action; the caller must release() after an admitted one"""
+        if not self.enabled:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            capacity = min(self.bucket.available(), self.max_concurrent - self.active)
+            position = self._position(ticket)
+            if capacity > 0 and position < capacity:
+                self._waiting.pop(ticket, None)
+                self.bucket.take()
+                self.active += 1
+                ADMISSION_DECISIONS.inc(outcome="admitted")
+                return True
+
+            # Keep the original place in line; only refresh the last-seen time
+            self._waiting[ticket] = now
+            ADMISSION_DECISIONS.inc(outcome="queued")
+            return False
+
+    def release(self):
+        """Finish an admitted action"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def _position(self, ticket):
+        for index, waiting in enumerate(self._waiting):
+            if waiting == ticket:
+                return index
+        return len(self._waiting)
+
+    def position(self, ticket):
+        """Number of sessions ahead of this ticket"""
+        with self._lock:
+            return self._position(ticket)
+
+    def stats(self):
+        with self._lock:
+            return {"active": self.active, "waiting": len(self._waiting)}
+
+# One controller per process for both login and vote submission, since both
+# compete for the same connection pool. ADMISSION_RATE=0 disables admission control.
+ADMISSION = AdmissionController(
+    rate=_env_float("ADMISSION_RATE", "50"),
+    burst=_env_float("ADMISSION_BURST", "100"),
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "10")),
+)
+ADMISSION_RETRY_SECONDS = _env_float("ADMISSION_RETRY_SECONDS", "1.0")
+
+ADMISSION_DECISIONS = REGISTRY.register(Counter(
+    "election_admission_decisions_total", "Admission decisions for login/vote actions", ("outcome",)))
+ADMISSION_STATE = REGISTRY.register(Gauge(
+    "election_admission_sessions", "Admitted (active) and queued (waiting) sessions", ("state",),
+    callback=lambda: {(state,): value for state, value in ADMISSION.stats().items()}))
+
+def admission_ticket():
+    """This session's place-in-line identifier"""
+    if 'admission_ticket' not in st.session_state:
+        st.session_state.admission_ticket = uuid.uuid4().hex
+    return st.session_state.admission_ticket
+
+def render_waiting_room(message):
+    """Show queue position, then retry automatically"""
+    position = ADMISSION.position(admission_ticket())
+    st.info(f"⏳ {message}\n\n현재 대기 순서: **{position + 1}번째** · 잠시 후 자동으로 다시 시도합니다.")
+    
+    # Don't hold a pooled connection while waiting
+    st.session_state.data_manager.release()
+    time.sleep(ADMISSION_RETRY_SECONDS)
+    st.rerun()
@@ -1,11 +1,36 @@
 import hashlib
+import hmac
 import streamlit as st
 import os
+from functools import lru_cache
 
-def hash_email(email):
-    """Create a hash of the email for anonymity"""
+# Server-side key for voter identifiers; without it, hashes fall back to plain SHA-256
+VOTER_HASH_SECRET = os.getenv("VOTER_HASH_SECRET", "")
+
+# Most recently hashed emails kept in memory per process
+VOTER_HASH_CACHE_SIZE = int(os.getenv("VOTER_HASH_CACHE_SIZE", "4096"))
+
+def legacy_hash_email(email):
+    """Unkeyed SHA-256 of the email, as stored before VOTER_HASH_SECRET existed"""
     return hashlib.sha256(email.encode()).hexdigest()
 
+def compute_voter_hash(email):
+    """Keyed voter identifier for an email (HMAC-SHA256 when a secret is configured)"""
+    if not VOTER_HASH_SECRET:
+        return legacy_hash_email(email)
+    return hmac.new(VOTER_HASH_SECRET.encode(), email.encode(), hashlib.sha256).hexdigest()
+
+@lru_cache(maxsize=VOTER_HASH_CACHE_SIZE)
+def hash_email(email):
+    """Create a hash of the email for anonymity (cached per process)"""
+    return compute_voter_hash(email)
+
+def voter_hash_key_id():
+    """Identify the current hashing key without revealing it"""
+    if not VOTER_HASH_SECRET:
+        return "sha256"
+    return "hmac-" + hashlib.sha256(b"voter-hash-key:" + VOTER_HASH_SECRET.encode()).hexdigest()[:16]
+
 def verify_admin(email, password):
     """Verify admin credentials"""
     # Get admin credentials from environment variables
@@ -0,0 +1,47 @@
+from collections import Counter
+
+# Ballot types an election can use, stored in the `ballot_type` setting
+BALLOT_TYPES = {
+    "pick_two": "2개 팀 선택",
+    "approval": "찬성 투표 (원하는 만큼 선택)",
+    "score": "점수 투표 (팀별 0~5점)",
+    "ranked": "선호 순위 투표 (즉석 결선)",
+}
+DEFAULT_BALLOT_TYPE = "pick_two"
+MAX_SCORE = 5
+
+def ballot_type_or_default(value):
+    """Unknown or missing settings fall back to the original two-team ballot"""
+    return value if value in BALLOT_TYPES else DEFAULT_BALLOT_TYPE
+
+def value_unit(ballot_type):
+    """Unit for tally values: points for score ballots, votes otherwise"""
+    return "점" if ballot_type == "score" else "표"
+
+def validate_ballot(ballot_type, ballot, user_team):
+    """Return an error message for an invalid ballot, or None.
+
+    pick_two/approval/ranked ballots are lists of team names (ranked in
+    preference order); score ballots map team name to 0..MAX_SCORE.
+    Teams deleted later are simply ignored by the tally.
+    """
+    if ballot_type == "score":
+        if not isinstance(ballot, dict) or not any(ballot.values()):
+            return "1점 이상을 준 팀이 하나 이상 있어야 합니다."
+        if any(not isinstance(score, int) or not 0 <= score <= MAX_SCORE for score in ballot.values()):
+            return f"점수는 0~{MAX_SCORE}점 사이여야 합니다."
+        chosen = list(ballot)
+    else:
+        if not isinstance(ballot, list):
+            return "잘못된 투표 형식입니다."
+        if ballot_type == "pick_two" and len(ballot) != 2:
+            return "정확히 2개의 팀을 선택해야 합니다."
+        if not ballot:
+            return "1개 이상의 팀을 선택해야 합니다."
+        if max(Counter(ballot).values()) > 1:
+            return "같은 팀을 두 번 선택할 수 없습니다."
+        chosen = ballot
+
+    if user_team in chosen:
+        return "본인 팀은 선택할 수 없습니다."
+    return None
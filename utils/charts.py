@@ -0,0 +1,207 @@
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.metrics import record_cache
+from utils.tally import vote_share_total
+
+# Built figures kept per process, shared by every session (least recently used evicted)
+FIGURE_CACHE_SIZE = 32
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+
+def cached_figure(name, key, build):
+    """Build a figure once per (name, key) and reuse it across reruns and sessions.
+
+    Callers must treat the returned figure as read-only; st.plotly_chart only
+    serializes it.
+    """
+    cache_key = (name, key)
+    with _figures_lock:
+        fig = _figures.get(cache_key)
+        if fig is not None:
+            _figures.move_to_end(cache_key)
+    record_cache("figures", fig is not None)
+
+    if fig is None:
+        fig = build()
+        with _figures_lock:
+            _figures[cache_key] = fig
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+    return fig
+
+def results_key(sorted_results):
+    """Cache key identifying a tally by its content"""
+    return tuple((team, votes) for team, votes in sorted_results)
+
+def rank_results(sorted_results, total_received_votes, finish_order=False):
+    """Competition ranks (1, 2, 2, 4) with vote share for (team, votes) pairs.
+
+    With `finish_order` (instant-runoff results, already in elimination
+    order) every team keeps its own position instead of sharing ranks.
+    """
+    ranked = []
+    previous_votes = None
+    rank = 0
+    for position, (team, votes) in enumerate(sorted_results, 1):
+        if finish_order or votes != previous_votes:
+            rank = position
+            previous_votes = votes
+        percentage = (votes / total_received_votes) * 100 if total_received_votes > 0 else 0.0
+        ranked.append({"rank": rank, "team": team, "votes": votes, "percentage": round(percentage, 1)})
+    return ranked
+
+def build_bar_chart(teams, votes):
+    """Final vote count bar chart"""
+    chart_df = pd.DataFrame({
+        '팀': teams,
+        '득표수': votes
+    })
+
+    fig = px.bar(
+        chart_df,
+        x='팀',
+        y='득표수',
+        title="팀별 최종 득표 결과",
+        color='득표수',
+        color_continuous_scale=['#33BB66', '#FFD700'],
+        text='득표수'
+    )
+
+    fig.update_layout(
+        title_x=0.5,
+        font=dict(size=14),
+        height=500,
+        showlegend=False
+    )
+
+    fig.update_traces(textposition='outside')
+    return fig
+
+def build_pie_chart(teams, votes):
+    """Vote share pie chart"""
+    fig = px.pie(
+        values=votes,
+        names=teams,
+        title="팀별 득표율",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+    fig.update_layout(
+        title=dict(
+            font=dict(size=20),
+            x=0.5
+        ),
+        font=dict(size=14)
+    )
+    return fig
+
+def build_status_chart(teams, votes):
+    """Live vote count bar chart for the admin voting status page"""
+    fig = px.bar(
+        x=teams,
+        y=votes,
+        title="팀별 득표 현황",
+        labels={'x': '팀', 'y': '득표수'},
+        color=votes,
+        color_continuous_scale='Viridis'
+    )
+
+    fig.update_layout(
+        showlegend=False,
+        xaxis_title="팀",
+        yaxis_title="득표수",
+        font=dict(size=14)
+    )
+    return fig
+
+def status_chart(sorted_results):
+    """Cached live status chart for a tally"""
+    teams = [team for team, _ in sorted_results]
+    votes = [count for _, count in sorted_results]
+    return cached_figure("status_bar", results_key(sorted_results), lambda: build_status_chart(teams, votes))
+
+def build_timeline_chart(minutes, votes, total_participants):
+    """Votes per minute (bars) with cumulative turnout (line) for the admin voting status page"""
+    # Minutes without votes are part of the timeline too
+    per_minute = pd.Series(votes, index=pd.DatetimeIndex(minutes)).asfreq('min', fill_value=0)
+    cumulative = per_minute.cumsum()
+    label = "누적 투표 수"
+    if total_participants > 0:
+        cumulative = cumulative / total_participants * 100
+        label = "누적 투표율 (%)"
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=per_minute.index, y=per_minute.values, name="분당 투표 수", marker_color='#33BB66'))
+    fig.add_trace(go.Scatter(
+        x=cumulative.index, y=cumulative.values, name=label,
+        mode='lines', yaxis='y2', line=dict(color='#FF8C00', width=3)
+    ))
+
+    fig.update_layout(
+        title="분당 투표 수와 누적 투표율",
+        xaxis_title="시각",
+        yaxis=dict(title="분당 투표 수"),
+        yaxis2=dict(title=label, overlaying='y', side='right', rangemode='tozero'),
+        legend=dict(orientation='h', y=-0.2),
+        font=dict(size=14)
+    )
+    return fig
+
+def timeline_chart(timeline, total_participants):
+    """Cached voting timeline chart for [(minute, votes)] buckets"""
+    minutes = [minute for minute, _ in timeline]
+    votes = [count for _, count in timeline]
+    key = (tuple(timeline), total_participants)
+    return cached_figure("timeline", key, lambda: build_timeline_chart(minutes, votes, total_participants))
+
+def snapshot_chart(snapshot, name):
+    """Cached Figure for a chart spec stored in a results snapshot"""
+    key = results_key((row['team'], row['votes']) for row in snapshot['results'])
+    # Figure(spec) validates the whole spec, so do it once per tally
+    return cached_figure(f"snapshot_{name}", key, lambda: go.Figure(snapshot['charts'][name]))
+
+def build_results_snapshot(results_data, stats, pairwise=None):
+    """Everything the results page shows, as one JSON-serializable dict"""
+    sorted_results = results_data['sorted_results']
+    ballot_type = results_data.get('ballot_type', 'pick_two')
+    total_received_votes = vote_share_total(results_data)
+    teams = [team for team, _ in sorted_results]
+    votes = [count for _, count in sorted_results]
+    # Instant-runoff shares come from the final round, where each ballot counts once
+    final_round = (results_data.get('rounds') or [{}])[-1] if ballot_type == "ranked" else None
+    pie_teams = list(final_round) if final_round else teams
+    pie_votes = list(final_round.values()) if final_round else votes
+
+    charts = {}
+    if total_received_votes > 0:
+        # Plain figure dicts; st.plotly_chart renders them without Plotly Express
+        key = results_key(sorted_results)
+        charts = {
+            "bar": json.loads(cached_figure("results_bar", key, lambda: build_bar_chart(teams, votes)).to_json()),
+            "pie": json.loads(cached_figure(
+                "results_pie", (key, tuple(zip(pie_teams, pie_votes))), lambda: build_pie_chart(pie_teams, pie_votes)
+            ).to_json()),
+        }
+
+    return {
+        "published_at": datetime.now().isoformat(timespec='seconds'),
+        "stats": {
+            "total_participants": stats['total_participants'],
+            "total_voted": stats['total_voted'],
+            "participation_rate": stats['participation_rate'],
+        },
+        "total_received_votes": total_received_votes,
+        "results": rank_results(sorted_results, total_received_votes, finish_order=ballot_type == "ranked"),
+        "charts": charts,
+        "ballot_type": ballot_type,
+        # Instant-runoff rounds ({team: votes} per round), ranked ballots only
+        "rounds": results_data.get('rounds'),
+        # utils.pairwise.pairwise_summary: Copeland ranking and frequent pairs
+        "pairwise": pairwise,
+    }
@@ -1,19 +1,31 @@
 import streamlit as st
-import pandas as pd
 import json
 from datetime import datetime
 from utils.auth import hash_email
+from utils.ballots import BALLOT_TYPES, validate_ballot
 from utils.db_manager import DatabaseManager
+from utils.exporter import export_dataset
 import re
+import time
+from utils.metrics import VOTES_CAST, CAST_VOTE_SECONDS, track_session
 
 class DataManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        # Any storage with the DatabaseManager interface can be injected. FileStorage
+        # covers everything here except election snapshots (export/restore_snapshot)
+        self.db = db if db is not None else DatabaseManager()
+        track_session(self)
     
     def initialize_data(self):
         """Initialize data - handled by database"""
         pass
     
+    def release(self):
+        """Release database resources held between reruns"""
+        release = getattr(self.db, "release", None)
+        if release is not None:
+            release()
+    
     def add_participants_bulk(self, email_text):
         """Add multiple participants from text input"""
         lines = email_text.strip().split('\n')
@@ -60,37 +72,79 @@ class DataManager:
         email_hash = hash_email(email)
         return self.db.has_voted(email_hash)
     
-    def cast_vote(self, email, selected_teams):
-        """Cast a vote for selected teams"""
-        if self.has_voted(email):
-            return False, "이미 투표하셨습니다."
+    def cast_vote(self, email, selected_teams, user_team=None):
+        """Cast a vote for selected teams (user_team from the session is used only while the database is unreachable)"""
+        started = time.perf_counter()
+        try:
+            success, message, outcome = self._cast_vote(email, selected_teams, user_team)
+        except Exception:
+            CAST_VOTE_SECONDS.observe(time.perf_counter() - started, outcome="error")
+            VOTES_CAST.inc(outcome="error")
+            raise
         
-        if len(selected_teams) != 2:
-            return False, "정확히 2개의 팀을 선택해야 합니다."
+        CAST_VOTE_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        VOTES_CAST.inc(outcome=outcome)
+        return success, message
+    
+    def _cast_vote(self, email, selected_teams, user_team=None):
+        """Validate and record a vote, returning (success, message, metrics outcome)"""
+        if self.has_voted(email):
+            return False, "이미 투표하셨습니다.", "duplicate"
         
-        user_team = self.get_user_team(email)
-        if user_team in selected_teams:
-            return False, "본인 팀은 선택할 수 없습니다."
+        # Re-read so a team reassigned since the page loaded is still excluded
+        user_team = self.db.get_voter_team(email, user_team)
+        error = validate_ballot(self.db.get_ballot_type(), selected_teams, user_team)
+        if error:
+            return False, error, "invalid"
         
         # Record vote in database
         email_hash = hash_email(email)
         if self.db.cast_vote(email_hash, selected_teams):
-            return True, "투표가 성공적으로 완료되었습니다!"
+            return True, "투표가 성공적으로 완료되었습니다!", "accepted"
         else:
-            return False, "투표 처리 중 오류가 발생했습니다."
+            return False, "투표 처리 중 오류가 발생했습니다.", "duplicate"
+    
+    def get_ballot_type(self):
+        """Ballot type of the current election"""
+        return self.db.get_ballot_type()
+    
+    def set_ballot_type(self, ballot_type):
+        """Change the ballot type; only allowed before the first vote"""
+        if ballot_type not in BALLOT_TYPES:
+            return False, "알 수 없는 투표 방식입니다."
+        if self.db.get_voting_stats()["total_voted"] > 0:
+            return False, "이미 투표가 시작되어 투표 방식을 바꿀 수 없습니다."
+        self.db.set_ballot_type(ballot_type)
+        return True, f"투표 방식이 '{BALLOT_TYPES[ballot_type]}'(으)로 변경되었습니다."
     
     def get_voting_stats(self):
         """Get voting statistics"""
         return self.db.get_voting_stats()
     
+    def get_voting_context(self, email):
+        """Everything the voting page needs for a student, loaded in one go"""
+        # Read the versions first so a concurrent change makes the context stale, not wrong
+        teams_version = self.db.get_teams_version()
+        participants_version = self.db.get_participants_version()
+        team = self.get_user_team(email)
+        return {
+            "email": email,
+            "team": team,
+            "voted": self.has_voted(email),
+            "available_teams": [name for name in self.db.get_teams() if name != team],
+            "teams_version": teams_version,
+            "participants_version": participants_version,
+            "ballot_type": self.db.get_ballot_type(),
+        }
+    
     def get_team_stats(self):
         """Get team statistics"""
         stats = self.db.get_team_stats()
+        results = self.db.get_results_data()
         team_stats = []
         
         for team, assigned_count in stats["team_counts"].items():
             # Get vote count for this team from results
-            results = self.db.get_results_data()
             vote_count = results["team_votes"].get(team, 0)
             
             team_stats.append({
@@ -103,8 +157,7 @@ class DataManager:
     
     def get_unassigned_participants(self):
         """Get participants not assigned to any team"""
-        participants = self.db.get_participants()
-        return [email for email, info in participants.items() if not info.get('team')]
+        return [email for email, team, _ in self.db.iter_participants() if not team]
     
     def update_teams(self, new_teams):
         """Update team list"""
@@ -112,13 +165,61 @@ class DataManager:
     
     def export_participants(self):
         """Export participants list as text"""
-        participants = self.db.get_participants()
-        return '\n'.join(participants.keys())
+        return '\n'.join(email for email, _, _ in self.db.iter_participants())
+    
+    def export_dataset(self, dataset, fmt="csv"):
+        """Export participants, votes or results as CSV/Parquet bytes"""
+        buffer = export_dataset(self.db, dataset, fmt)
+        try:
+            return buffer.read()
+        finally:
+            buffer.close()
     
     def get_results_data(self):
         """Get formatted results data for display"""
         return self.db.get_results_data()
     
+    def get_pairwise_summary(self, results_data=None):
+        """Copeland ranking, Condorcet winner and frequent pairs from the pair counts"""
+        from utils.pairwise import pairwise_summary
+        
+        results_data = results_data or self.db.get_results_data()
+        teams = self.db.get_teams()
+        together, ahead = self.db.get_pair_matrices(teams)
+        return pairwise_summary(teams, together, ahead, results_data['total_votes'])
+    
+    def _build_results_snapshot(self):
+        from utils.charts import build_results_snapshot
+        
+        results_data = self.db.get_results_data()
+        return build_results_snapshot(results_data, self.db.get_voting_stats(), self.get_pairwise_summary(results_data))
+    
+    def publish_results(self):
+        """Freeze the current tally into a results snapshot and show it to everyone"""
+        payload = self._build_results_snapshot()
+        version = self.db.publish_results(payload)
+        self.db.set_show_results(True)
+        return version
+    
+    def get_results_snapshot(self):
+        """Published results snapshot, or a live one (not stored) if none was published"""
+        snapshot = self.db.get_results_snapshot()
+        if snapshot is None:
+            snapshot = {**self._build_results_snapshot(), "version": None}
+        return snapshot
+    
+    def clear_all_data(self):
+        """Reset the election to its initial state"""
+        self.db.clear_all_data()
+    
+    def export_snapshot(self):
+        """Export the whole election as compressed bytes"""
+        return self.db.export_snapshot()
+    
+    def restore_snapshot(self, data):
+        """Restore the whole election from snapshot bytes"""
+        self.db.restore_snapshot(data)
+    
     def is_valid_email(self, email):
         """Validate email format"""
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
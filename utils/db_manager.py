@@ -1,10 +1,25 @@
 import os
+import gzip
 import hashlib
+import random
+import threading
+import time
+import uuid
 from datetime import datetime
-from sqlalchemy import create_engine, Column, String, DateTime, Boolean, Integer, Text
+from sqlalchemy import create_engine, Column, String, DateTime, Boolean, Integer, Text, select, text, insert, update, delete, func
+from sqlalchemy.exc import (
+    DataError, DBAPIError, IntegrityError, InterfaceError, OperationalError, PendingRollbackError,
+    TimeoutError as PoolTimeoutError
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import json
+from utils.auth import hash_email
+from utils.ballots import ballot_type_or_default
+from utils.instrumentation import instrument_engine
+from utils.metrics import track_engine, record_cache
+from utils.vote_queue import VOTE_GROUP_COMMIT, VoteWriter
+from utils.vote_spool import VOTE_SPOOL_PATH, VoteSpool
 
 Base = declarative_base()
 
@@ -12,7 +27,8 @@ class Participant(Base):
     __tablename__ = 'participants'
     
     email = Column(String, primary_key=True)
-    team = Column(String, nullable=True)
+    team = Column(String, nullable=True, index=True)
+    voter_hash = Column(String, nullable=True, index=True)  # hash_email(email), matches Vote.email_hash
     created_at = Column(DateTime, default=datetime.now)
 
 class Team(Base):
@@ -26,7 +42,7 @@ class Vote(Base):
     
     email_hash = Column(String, primary_key=True)
     selected_teams = Column(Text)  # JSON string
-    voted_at = Column(DateTime, default=datetime.now)
+    voted_at = Column(DateTime, default=datetime.now, index=True)
 
 class Settings(Base):
     __tablename__ = 'settings'
@@ -35,26 +51,387 @@ class Settings(Base):
     value = Column(String)
     updated_at = Column(DateTime, default=datetime.now)
 
+class ResultsSnapshot(Base):
+    __tablename__ = 'results_snapshots'
+    
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    payload = Column(Text)  # JSON from charts.build_results_snapshot
+    published_at = Column(DateTime, default=datetime.now)
+
+class PairCount(Base):
+    __tablename__ = 'pair_counts'
+    
+    # team_a <= team_b; see utils.pairwise for what the counts mean
+    team_a = Column(String, primary_key=True)
+    team_b = Column(String, primary_key=True)
+    together = Column(Integer, nullable=False, default=0)
+    a_over_b = Column(Integer, nullable=False, default=0)
+    b_over_a = Column(Integer, nullable=False, default=0)
+
+class VoteCount(Base):
+    __tablename__ = 'vote_counts'
+    
+    # Stored votes spread over a few rows; their sum is the vote count
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    votes = Column(Integer, nullable=False, default=0)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String)
+    applied_at = Column(DateTime, default=datetime.now)
+
+# Tables included in election snapshots, in insert order
+SNAPSHOT_TABLES = (Team, Participant, Vote, Settings, ResultsSnapshot)
+# Tables derived from the ones above; emptied with them and rebuilt after a restore
+DERIVED_TABLES = (PairCount, VoteCount)
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Fail fast instead of hanging when the database stalls (unset: driver defaults)
+DB_TIMEOUT_SECONDS = os.getenv('DB_TIMEOUT_SECONDS')
+
+# Errors meaning the primary database is unreachable or stalled, not that the data is wrong.
+# PendingRollbackError: a session left over from such a failure before it was rolled back.
+PRIMARY_UNAVAILABLE_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, PendingRollbackError)
+
+def primary_unavailable(error):
+    """True if `error` means the primary is unavailable (including any dropped connection)"""
+    return isinstance(error, PRIMARY_UNAVAILABLE_ERRORS) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+def _timeout_connect_args(database_url):
+    if not DB_TIMEOUT_SECONDS:
+        return {}
+    seconds = float(DB_TIMEOUT_SECONDS)
+    if database_url.startswith('postgresql'):
+        return {
+            'connect_timeout': max(1, int(seconds)),
+            'options': f'-c statement_timeout={int(seconds * 1000)}'
+        }
+    if database_url.startswith('sqlite'):
+        return {'timeout': seconds}
+    return {}
+
+# One engine (and connection pool) per database URL per process
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(database_url):
+    """Get the shared engine for a URL, migrating the schema on first use"""
+    engine = _engines.get(database_url)
+    if engine is not None:
+        return engine
+    
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            from utils.migrations import ensure_schema
+            
+            engine = create_engine(database_url, connect_args=_timeout_connect_args(database_url))
+            instrument_engine(engine)
+            track_engine(engine)
+            ensure_schema(engine)
+            _engines[database_url] = engine
+    return engine
+
+# Longest time (seconds) a process may serve settings changed by another process
+SETTINGS_TTL = float(os.getenv('SETTINGS_TTL', '0.5'))
+
+def touch_settings_version(connection):
+    """Give the settings_version row a new unique token in the caller's transaction.
+    
+    Every settings write does this so other processes' caches reload. A
+    random token needs no clock: updated_at comes from each app host's
+    clock, which may lag or step back (DST) and hide a real change.
+    """
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    
+    # Upsert, so concurrent writers serialize on the row instead of racing to insert it
+    statement = dialect_insert(Settings).values(
+        key='settings_version', value=uuid.uuid4().hex, updated_at=datetime.now()
+    )
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[Settings.key],
+        set_={'value': statement.excluded.value, 'updated_at': statement.excluded.updated_at}
+    ))
+
+class SettingsCache:
+    """Process-wide settings values, revalidated against the settings_version token"""
+    
+    def __init__(self, ttl=SETTINGS_TTL):
+        self.ttl = ttl
+        self.values = None
+        self.watermark = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self, session, key, default=None):
+        """Read a setting, touching the database at most once per TTL per process"""
+        values = self.values
+        if values is not None and time.monotonic() - self.checked_at < self.ttl:
+            record_cache("settings", True)
+            return values.get(key, default)
+        
+        record_cache("settings", False)
+        # Only one thread revalidates; the others keep serving the previous values
+        if self._lock.acquire(blocking=values is None):
+            try:
+                self._revalidate(session)
+            except Exception as error:
+                if not primary_unavailable(error):
+                    raise
+                session.rollback()
+                # Keep serving the last known values while the database is unreachable
+                if values is None:
+                    raise
+            finally:
+                self._lock.release()
+        # An invalidate() racing this read falls back to the values we started with
+        return (self.values or values or {}).get(key, default)
+    
+    def _revalidate(self, session):
+        # One primary-key read; without the row (e.g. changed by hand) reload every time
+        watermark = session.execute(
+            select(Settings.value).where(Settings.key == 'settings_version')
+        ).scalar()
+        if self.values is None or watermark is None or watermark != self.watermark:
+            self.values = dict(session.execute(select(Settings.key, Settings.value)).all())
+            self.watermark = watermark
+        self.checked_at = time.monotonic()
+    
+    def write(self, key, value):
+        """Write-through after a committed change so this process sees it immediately"""
+        with self._lock:
+            if self.values is not None:
+                self.values = {**self.values, key: value}
+                # Next revalidation reloads and picks up the new watermark
+                self.watermark = None
+    
+    def invalidate(self):
+        with self._lock:
+            self.values = None
+
+_settings_caches = {}
+
+# Published snapshots are immutable, so the latest one per URL is kept for good
+_published_results = {}
+
+# Latest turnout-by-team per URL with the data version it was computed at
+_turnout_by_team = {}
+
+# Per-minute vote counts per URL, extended from a voted_at watermark on each refresh
+_vote_timelines = {}
+
+def get_settings_cache(database_url):
+    """Get the shared settings cache for a URL"""
+    with _engines_lock:
+        return _settings_caches.setdefault(database_url, SettingsCache())
+
+_vote_writers = {}
+_vote_spools = {}
+
+def get_vote_writer(database_url):
+    """Get the shared group-commit vote writer for a URL, starting it on first use"""
+    with _engines_lock:
+        writer = _vote_writers.get(database_url)
+    if writer is None:
+        # The writer thread owns its own session; nothing else touches it
+        writer_db = DatabaseManager()
+        with _engines_lock:
+            writer = _vote_writers.get(database_url)
+            if writer is None:
+                writer = _vote_writers[database_url] = VoteWriter(
+                    writer_db.insert_votes_batch, reset=writer_db.session.rollback
+                )
+    return writer
+
+def upsert_pair_counts(connection, rows):
+    """Add pair-count deltas (from utils.pairwise.merge_ballot_pairs) to pair_counts"""
+    if not rows:
+        return
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    
+    # Lock rows in one global order: batches from the group-commit writer and
+    # the spool drain touch overlapping pairs and would otherwise deadlock
+    rows = sorted(rows, key=lambda row: (row['team_a'], row['team_b']))
+    
+    # executemany with one fixed statement: compiled once and cached, unlike a
+    # multi-row VALUES clause whose shape changes with every batch
+    table = PairCount.__table__
+    statement = dialect_insert(table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.team_a, table.c.team_b],
+        set_={name: table.c[name] + statement.excluded[name] for name in ('together', 'a_over_b', 'b_over_a')}
+    ), rows)
+
+def rebuild_pair_counts(connection):
+    """Recompute pair_counts from every stored vote"""
+    from utils.pairwise import ballot_teams, matrices_from_ballots, pair_rows_from_matrices
+    
+    ballot_type = ballot_type_or_default(
+        connection.execute(select(Settings.value).where(Settings.key == 'ballot_type')).scalar()
+    )
+    ballots = [json.loads(value) for value in connection.execute(select(Vote.selected_teams)).scalars()]
+    # Every team a ballot mentions, including deleted ones, like the incremental updates
+    teams = ballot_teams(ballots)
+    together, ahead = matrices_from_ballots(ballot_type, teams, ballots)
+    
+    connection.execute(PairCount.__table__.delete())
+    rows = pair_rows_from_matrices(teams, together, ahead)
+    if rows:
+        connection.execute(PairCount.__table__.insert(), rows)
+
+# Concurrent vote transactions pick a random shard, so they rarely wait on the same row
+VOTE_COUNT_SHARDS = 16
+
+def vote_count_increment_statement(dialect_name, shard, stored):
+    """Add `stored` votes to one vote_counts shard, creating the row if needed"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    
+    statement = dialect_insert(VoteCount).values(shard=shard, votes=stored)
+    return statement.on_conflict_do_update(
+        index_elements=[VoteCount.shard], set_={'votes': VoteCount.votes + statement.excluded.votes}
+    )
+
+def votes_count_statement():
+    """Number of stored votes, summed over the vote_counts shards"""
+    return select(func.coalesce(func.sum(VoteCount.votes), 0))
+
+def rebuild_vote_counts(connection):
+    """Recompute vote_counts from the votes table"""
+    count = connection.execute(select(func.count()).select_from(Vote)).scalar_one()
+    connection.execute(VoteCount.__table__.delete())
+    connection.execute(VoteCount.__table__.insert().values(shard=0, votes=count))
+
+def get_vote_spool(database_url):
+    """Get the shared local vote spool for a URL, or None unless VOTE_SPOOL_PATH is set"""
+    if not VOTE_SPOOL_PATH:
+        return None
+    with _engines_lock:
+        spool = _vote_spools.get(database_url)
+    if spool is None:
+        # The drain thread owns its own session; nothing else touches it
+        drain_db = DatabaseManager()
+        with _engines_lock:
+            spool = _vote_spools.get(database_url)
+            if spool is None:
+                spool = _vote_spools[database_url] = VoteSpool(
+                    VOTE_SPOOL_PATH, drain_db.insert_votes_batch, reset=drain_db.session.rollback,
+                    unavailable=primary_unavailable
+                )
+    return spool
+
+# Statement builders for the hot queries; benchmarks/check_query_plans EXPLAINs these same statements
+def participant_statement(email):
+    """The participant row for an email (primary key lookup)"""
+    return select(Participant).where(Participant.email == email)
+
+def team_members_statement(team):
+    """Participants assigned to a team (team index)"""
+    return select(Participant).where(Participant.team == team)
+
+def team_member_counts_statement():
+    """(team, members) per team, one grouped pass over the team index"""
+    return select(Participant.team, func.count()).group_by(Participant.team)
+
+def voted_hashes_statement(email_hashes):
+    """Email hashes among `email_hashes` that have a stored vote (primary key lookups)"""
+    return select(Vote.email_hash).where(Vote.email_hash.in_(list(email_hashes)))
+
+def turnout_by_team_statement():
+    """(team, members, voted) per team; stored voter hashes let votes join without hashing any email"""
+    return (
+        select(Participant.team, func.count(), func.count(Vote.email_hash))
+        .outerjoin(Vote, Vote.email_hash == Participant.voter_hash)
+        .group_by(Participant.team)
+    )
+
+def votes_per_minute_statement(dialect_name, since=None):
+    """(minute, votes) for votes at or after `since`; a range scan on the voted_at index"""
+    if dialect_name == 'postgresql':
+        bucket = func.date_trunc('minute', Vote.voted_at)
+    else:
+        bucket = func.strftime('%Y-%m-%d %H:%M', Vote.voted_at)
+    statement = select(bucket, func.count()).group_by(bucket)
+    if since is not None:
+        statement = statement.where(Vote.voted_at >= since)
+    return statement
+
+def snapshot_records(snapshot):
+    """Validate an export_snapshot payload and return [(table, records)] to insert.
+    
+    Raises ValueError for anything malformed. Tables missing from the
+    snapshot restore empty; columns the current schema no longer has are
+    dropped.
+    """
+    if not isinstance(snapshot, dict) or snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError("지원하지 않는 스냅샷 형식입니다.")
+    tables = snapshot.get("tables")
+    if not isinstance(tables, dict):
+        raise ValueError("스냅샷에 테이블 데이터가 없습니다.")
+    
+    table_records = []
+    for model in SNAPSHOT_TABLES:
+        table = model.__table__
+        table_data = tables.get(table.name)
+        if table_data is None:
+            continue
+        columns = table_data.get("columns") if isinstance(table_data, dict) else None
+        rows = table_data.get("rows") if isinstance(table_data, dict) else None
+        if not isinstance(columns, list) or not isinstance(rows, list):
+            raise ValueError(f"스냅샷의 {table.name} 테이블 형식이 올바르지 않습니다.")
+        if not rows:
+            continue
+        
+        # Only restore columns the current schema still knows about
+        known = [name for name in columns if name in table.columns]
+        datetime_columns = {name for name in known if isinstance(table.columns[name].type, DateTime)}
+        positions = [columns.index(name) for name in known]
+        
+        records = []
+        for number, row in enumerate(rows, 1):
+            if not isinstance(row, list) or len(row) != len(columns):
+                raise ValueError(f"스냅샷의 {table.name} 테이블 {number}번째 행이 올바르지 않습니다.")
+            record = {}
+            for name, position in zip(known, positions):
+                value = row[position]
+                if value is not None and name in datetime_columns:
+                    try:
+                        value = datetime.fromisoformat(value)
+                    except (TypeError, ValueError):
+                        raise ValueError(f"스냅샷의 {table.name}.{name} 값이 올바른 시각이 아닙니다: {value!r}")
+                record[name] = value
+            records.append(record)
+        table_records.append((table, records))
+    return table_records
+
 class DatabaseManager:
     def __init__(self):
         self.database_url = os.getenv('DATABASE_URL')
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable not found")
         
-        self.engine = create_engine(self.database_url)
-        
-        # Create tables if they don't exist
-        try:
-            Base.metadata.create_all(self.engine)
-        except Exception as e:
-            # Tables might already exist, ignore the error
-            pass
+        # Schema and default data are handled once per process by the migrations
+        self.engine = get_engine(self.database_url)
         
         Session = sessionmaker(bind=self.engine)
         self.session = Session()
-        
-        # Initialize default data
-        self.initialize_default_data()
+        self.settings = get_settings_cache(self.database_url)
+    
+    def release(self):
+        """Return the session's connection to the shared pool"""
+        self.session.close()
     
     def initialize_default_data(self):
         """Initialize default data if not exists"""
@@ -65,57 +442,172 @@ class DatabaseManager:
         
         # Set default settings
         if not self.session.query(Settings).filter_by(key='show_results').first():
-            show_results = Settings(key='show_results', value='false')
-            self.session.add(show_results)
+            self._stage_setting('show_results', 'false')
         
         self.session.commit()
     
+    def _commit_participants(self):
+        """Commit a participant change together with a new participants_version"""
+        version = self._bump_version('participants_version')
+        self.session.commit()
+        self.settings.write('participants_version', version)
+    
     def add_participant(self, email, team=None):
         """Add a participant"""
-        existing = self.session.query(Participant).filter_by(email=email).first()
+        existing = self.session.scalars(participant_statement(email)).first()
         if not existing:
-            participant = Participant(email=email, team=team)
+            participant = Participant(email=email, team=team, voter_hash=hash_email(email))
             self.session.add(participant)
-            self.session.commit()
+            self._commit_participants()
             return True
         return False
     
     def remove_participant(self, email):
         """Remove a participant"""
-        participant = self.session.query(Participant).filter_by(email=email).first()
+        participant = self.session.scalars(participant_statement(email)).first()
         if participant:
             self.session.delete(participant)
-            self.session.commit()
+            self._commit_participants()
             return True
         return False
     
     def assign_team(self, email, team):
         """Assign team to participant"""
-        participant = self.session.query(Participant).filter_by(email=email).first()
+        participant = self.session.scalars(participant_statement(email)).first()
         if participant:
             participant.team = team
-            self.session.commit()
+            self._commit_participants()
             return True
         return False
     
+    def assign_teams(self, assignments):
+        """Assign teams for many participants at once ({email: team or None})"""
+        if not assignments:
+            return
+        # ORM bulk UPDATE by primary key: one executemany round trip
+        self.session.execute(
+            update(Participant),
+            [{'email': email, 'team': team} for email, team in assignments.items()]
+        )
+        self._commit_participants()
+    
+    def remove_participants(self, emails):
+        """Remove many participants in one statement"""
+        if not emails:
+            return
+        self.session.execute(delete(Participant).where(Participant.email.in_(list(emails))))
+        self._commit_participants()
+    
+    def get_participant_frame(self):
+        """Get participants as a DataFrame with email, team, voted, created_at columns"""
+        # Only the admin pages need pandas; keep it off the login path
+        import pandas as pd
+        
+        teams = self.get_teams()
+        # Stored voter hashes let the database match votes without hashing every email
+        result = self.session.execute(
+            select(Participant.email, Participant.team, Participant.created_at, Vote.email_hash.is_not(None))
+            .outerjoin(Vote, Vote.email_hash == Participant.voter_hash)
+            .order_by(Participant.email)
+        )
+        frame = pd.DataFrame.from_records(result.all(), columns=["email", "team", "created_at", "voted"])
+        frame["voted"] = frame["voted"].astype(bool)
+        
+        # Teams no longer in the team list become NaN, same as unassigned
+        frame["team"] = pd.Categorical(frame["team"], categories=teams)
+        return frame[["email", "team", "voted", "created_at"]]
+    
     def get_participants(self):
         """Get all participants"""
         participants = self.session.query(Participant).all()
         return {p.email: {'team': p.team, 'created_at': p.created_at.isoformat()} 
                 for p in participants}
     
+    def _stream_rows(self, statement, batch_size=1000):
+        """Yield batches of rows from a server-side cursor"""
+        result = self.session.execute(
+            statement.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for batch in result.partitions():
+            yield batch
+    
+    def stream_participant_rows(self, batch_size=1000):
+        """Yield batches of (email, team, created_at) ordered by email"""
+        statement = select(Participant.email, Participant.team, Participant.created_at).order_by(Participant.email)
+        return self._stream_rows(statement, batch_size)
+    
+    def stream_vote_rows(self, batch_size=1000):
+        """Yield batches of (email_hash, selected_teams_json, voted_at) ordered by hash"""
+        statement = select(Vote.email_hash, Vote.selected_teams, Vote.voted_at).order_by(Vote.email_hash)
+        return self._stream_rows(statement, batch_size)
+    
+    def stream_ballot_rows(self, batch_size=1000):
+        """Yield batches of selected_teams JSON ordered by the ballot itself.
+        
+        For anonymized exports: identical ballots are indistinguishable, so the
+        order carries nothing that links a ballot back to its voter.
+        """
+        statement = select(Vote.selected_teams).order_by(Vote.selected_teams)
+        return self._stream_rows(statement, batch_size)
+    
+    def iter_participants(self, batch_size=1000):
+        """Stream participants as (email, team, created_at) tuples"""
+        for batch in self.stream_participant_rows(batch_size):
+            for email, team, created_at in batch:
+                yield email, team, created_at
+    
+    def iter_votes(self, batch_size=1000):
+        """Stream votes as (email_hash, selected_teams, voted_at) tuples"""
+        for batch in self.stream_vote_rows(batch_size):
+            for email_hash, selected_teams, voted_at in batch:
+                yield email_hash, json.loads(selected_teams), voted_at
+    
+    def get_voted_hashes(self, email_hashes):
+        """Return the subset of email hashes that have voted"""
+        if not email_hashes:
+            return set()
+        rows = self.session.execute(voted_hashes_statement(email_hashes))
+        return {row[0] for row in rows}
+    
     def get_teams(self):
         """Get all teams"""
         teams = self.session.query(Team).all()
         return [t.name for t in teams]
     
+    def get_teams_version(self):
+        """Token that changes whenever the team list changes (served from the settings cache)"""
+        return self.settings.get(self.session, 'teams_version', '0')
+    
+    def get_participants_version(self):
+        """Token that changes whenever participants or their teams change (served from the settings cache)"""
+        return self.settings.get(self.session, 'participants_version', '0')
+    
+    def _stage_setting(self, key, value, updated_at=None):
+        """Stage a setting change and a new settings_version; call before commit, then settings.write after"""
+        updated_at = updated_at or datetime.now()
+        setting = self.session.get(Settings, key)
+        if setting:
+            setting.value = value
+            setting.updated_at = updated_at
+        else:
+            self.session.add(Settings(key=key, value=value, updated_at=updated_at))
+        touch_settings_version(self.session.connection())
+    
+    def _bump_version(self, key):
+        """Stage a new version token setting; call before commit, then settings.write after"""
+        version = str(time.time_ns())
+        self._stage_setting(key, version)
+        return version
+    
     def add_team(self, team_name):
         """Add a new team"""
         existing = self.session.query(Team).filter_by(name=team_name).first()
         if not existing:
             team = Team(name=team_name)
             self.session.add(team)
+            version = self._bump_version('teams_version')
             self.session.commit()
+            self.settings.write('teams_version', version)
             return True
         return False
     
@@ -124,12 +616,14 @@ class DatabaseManager:
         team = self.session.query(Team).filter_by(name=team_name).first()
         if team:
             # Remove team assignments for this team
-            participants = self.session.query(Participant).filter_by(team=team_name).all()
+            participants = self.session.scalars(team_members_statement(team_name)).all()
             for p in participants:
                 p.team = None
             
             self.session.delete(team)
+            version = self._bump_version('teams_version')
             self.session.commit()
+            self.settings.write('teams_version', version)
             return True
         return False
     
@@ -149,23 +643,132 @@ class DatabaseManager:
         for team in to_add:
             self.add_team(team)
     
+    @property
+    def spool(self):
+        return get_vote_spool(self.database_url)
+    
     def cast_vote(self, email_hash, selected_teams):
-        """Cast a vote"""
-        existing = self.session.query(Vote).filter_by(email_hash=email_hash).first()
-        if not existing:
-            vote = Vote(
-                email_hash=email_hash, 
-                selected_teams=json.dumps(selected_teams)
-            )
-            self.session.add(vote)
+        """Cast a vote, spooling it locally if the primary database is unavailable"""
+        spool = self.spool
+        if spool is None:
+            return self._store_vote(email_hash, selected_teams)
+        
+        if spool.contains(email_hash):
+            return False
+        if spool.primary_available():
+            try:
+                return self._store_vote(email_hash, selected_teams)
+            except Exception as error:
+                if not primary_unavailable(error):
+                    raise
+                spool.mark_primary_down()
+        
+        # Drained to the primary once it is back; the drain skips hashes it already has
+        return spool.add(email_hash, selected_teams)
+    
+    def _store_vote(self, email_hash, selected_teams):
+        """Store a vote in the primary database"""
+        if VOTE_GROUP_COMMIT:
+            return get_vote_writer(self.database_url).submit(email_hash, selected_teams).result()
+        
+        try:
+            if not self.get_voted_hashes([email_hash]):
+                vote = Vote(
+                    email_hash=email_hash, 
+                    selected_teams=json.dumps(selected_teams)
+                )
+                self.session.add(vote)
+                self._add_vote_counts([selected_teams])
+                self.session.commit()
+                return True
+            return False
+        except Exception:
+            # Never leave the session in a failed transaction for the next rerun
+            self.session.rollback()
+            raise
+    
+    def _add_vote_counts(self, ballots):
+        """Stage pair-count and vote-count updates for newly stored ballots (same transaction as the votes)"""
+        from utils.pairwise import merge_ballot_pairs
+        
+        connection = self.session.connection()
+        upsert_pair_counts(connection, merge_ballot_pairs(self.get_ballot_type(), ballots))
+        connection.execute(vote_count_increment_statement(
+            connection.dialect.name, random.randrange(VOTE_COUNT_SHARDS), len(ballots)
+        ))
+    
+    def insert_votes_batch(self, votes):
+        """Store many (email_hash, selected_teams, voted_at) votes in one transaction.
+        
+        Returns the set of email hashes stored; hashes that already voted
+        (or repeat within the batch) are skipped.
+        """
+        rows = {}
+        ballots = {}
+        for email_hash, selected_teams, voted_at in votes:
+            if email_hash not in rows:
+                rows[email_hash] = {
+                    'email_hash': email_hash,
+                    'selected_teams': json.dumps(selected_teams),
+                    'voted_at': voted_at
+                }
+                ballots[email_hash] = selected_teams
+        
+        try:
+            return self._insert_new_votes(rows, ballots)
+        except Exception:
+            # The writer and spool drain sessions live for the whole process; a failed
+            # transaction left open would fail every later batch with PendingRollbackError
+            self.session.rollback()
+            raise
+    
+    def _insert_new_votes(self, rows, ballots):
+        """insert_votes_batch without the rollback on failure"""
+        existing = self.get_voted_hashes(rows)
+        new_rows = [row for email_hash, row in rows.items() if email_hash not in existing]
+        if not new_rows:
+            self.session.rollback()
+            return set()
+        
+        try:
+            # One multi-row INSERT and one COMMIT for the whole batch
+            self.session.execute(insert(Vote).values(new_rows))
+            self._add_vote_counts([ballots[row['email_hash']] for row in new_rows])
             self.session.commit()
-            return True
-        return False
+            return {row['email_hash'] for row in new_rows}
+        except IntegrityError:
+            # Another process stored one of these since the check; fall back to one row at a time
+            self.session.rollback()
+        
+        stored = set()
+        for row in new_rows:
+            try:
+                self.session.execute(insert(Vote).values(row))
+                self._add_vote_counts([ballots[row['email_hash']]])
+                self.session.commit()
+                stored.add(row['email_hash'])
+            except IntegrityError:
+                self.session.rollback()
+        return stored
     
     def has_voted(self, email_hash):
         """Check if user has voted"""
-        vote = self.session.query(Vote).filter_by(email_hash=email_hash).first()
-        return vote is not None
+        spool = self.spool
+        if spool is None:
+            return bool(self.get_voted_hashes([email_hash]))
+        
+        if spool.contains(email_hash):
+            return True
+        if spool.primary_available():
+            try:
+                return bool(self.get_voted_hashes([email_hash]))
+            except Exception as error:
+                if not primary_unavailable(error):
+                    raise
+                self.session.rollback()
+                spool.mark_primary_down()
+        # Unknown while the primary is down; cast_vote's spool still allows one vote per hash
+        return False
     
     def get_votes(self):
         """Get all votes"""
@@ -177,30 +780,103 @@ class DatabaseManager:
     
     def get_user_team(self, email):
         """Get team for specific user"""
-        participant = self.session.query(Participant).filter_by(email=email).first()
+        participant = self.session.scalars(participant_statement(email)).first()
         return participant.team if participant else None
     
+    def get_voter_team(self, email, known_team=None):
+        """Team to validate a ballot against: read fresh, or `known_team` while the primary is unavailable"""
+        spool = self.spool
+        if spool is not None and not spool.primary_available():
+            return known_team
+        try:
+            return self.get_user_team(email)
+        except Exception as error:
+            if spool is None or not primary_unavailable(error):
+                raise
+            self.session.rollback()
+            spool.mark_primary_down()
+            return known_team
+    
     def is_email_registered(self, email):
         """Check if email is registered"""
-        participant = self.session.query(Participant).filter_by(email=email).first()
+        participant = self.session.scalars(participant_statement(email)).first()
         return participant is not None
     
     def get_show_results(self):
         """Get results display status"""
-        setting = self.session.query(Settings).filter_by(key='show_results').first()
-        return setting.value.lower() == 'true' if setting else False
+        value = self.settings.get(self.session, 'show_results', 'false')
+        return value.lower() == 'true'
     
     def set_show_results(self, show):
         """Set results display status"""
-        setting = self.session.query(Settings).filter_by(key='show_results').first()
-        if setting:
-            setting.value = 'true' if show else 'false'
-            setting.updated_at = datetime.now()
-        else:
-            setting = Settings(key='show_results', value='true' if show else 'false')
-            self.session.add(setting)
+        value = 'true' if show else 'false'
+        self._stage_setting('show_results', value)
+        self.session.commit()
+        self.settings.write('show_results', value)
+    
+    def get_pair_matrices(self, teams):
+        """(together, ahead) pairwise matrices for `teams` from the incrementally kept pair counts"""
+        from utils.pairwise import matrices_from_rows
         
+        rows = self.session.execute(select(
+            PairCount.team_a, PairCount.team_b, PairCount.together, PairCount.a_over_b, PairCount.b_over_a
+        )).all()
+        return matrices_from_rows(teams, rows)
+    
+    def rebuild_pair_counts(self):
+        """Recompute the pair and vote counts from raw votes (e.g. after editing votes by hand)"""
+        rebuild_pair_counts(self.session.connection())
+        rebuild_vote_counts(self.session.connection())
+        self.session.commit()
+    
+    def get_ballot_type(self):
+        """Ballot type of this election (served from the settings cache)"""
+        return ballot_type_or_default(self.settings.get(self.session, 'ballot_type'))
+    
+    def set_ballot_type(self, ballot_type):
+        """Set the ballot type of this election"""
+        self._stage_setting('ballot_type', ballot_type)
         self.session.commit()
+        self.settings.write('ballot_type', ballot_type)
+    
+    def publish_results(self, payload):
+        """Store a new immutable results snapshot and make it the published one"""
+        try:
+            latest = self.session.execute(select(func.max(ResultsSnapshot.version))).scalar()
+            version = (latest or 0) + 1
+            published_at = datetime.now()
+            self.session.add(ResultsSnapshot(
+                version=version, payload=json.dumps(payload, ensure_ascii=False), published_at=published_at
+            ))
+            
+            # Versions restart after a reset, so the timestamp keeps the key unique
+            key = f"{version}:{published_at.isoformat()}"
+            self._stage_setting('results_version', key, published_at)
+            
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        
+        self.settings.write('results_version', key)
+        return version
+    
+    def get_results_snapshot(self):
+        """Get the published results snapshot (with its version) or None"""
+        key = self.settings.get(self.session, 'results_version')
+        if key is None:
+            return None
+        
+        cached = _published_results.get(self.database_url)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        row = self.session.get(ResultsSnapshot, int(key.split(':', 1)[0]))
+        if row is None:
+            return None
+        snapshot = {**json.loads(row.payload), "version": row.version}
+        _published_results[self.database_url] = (key, snapshot)
+        return snapshot
     
     def get_voting_stats(self):
         """Get voting statistics"""
@@ -217,53 +893,193 @@ class DatabaseManager:
     def get_team_stats(self):
         """Get team statistics"""
         teams = self.get_teams()
-        team_counts = {}
-        
-        for team in teams:
-            count = self.session.query(Participant).filter_by(team=team).count()
-            team_counts[team] = count
         
-        unassigned_count = self.session.query(Participant).filter(Participant.team.is_(None)).count()
+        # One grouped pass over the team index instead of a COUNT per team
+        counts = dict(self.session.execute(team_member_counts_statement()).all())
+        team_counts = {team: counts.get(team, 0) for team in teams}
+        unassigned_count = counts.get(None, 0)
         
         return {
             "team_counts": team_counts,
             "unassigned_count": unassigned_count
         }
     
-    def get_results_data(self):
-        """Get formatted results data"""
-        votes = self.get_votes()
-        teams = self.get_teams()
+    def get_votes_count(self):
+        """Number of stored votes from the vote_counts shards (a handful of rows, not the votes table)"""
+        return self.session.execute(votes_count_statement()).scalar_one()
+    
+    def get_data_version(self):
+        """Token that changes whenever participants, teams or votes change.
         
-        # Count votes for each team
-        team_votes = {}
-        for team in teams:
-            team_votes[team] = 0
+        The version settings come from the settings cache. Votes are only ever
+        inserted, each insert adds to vote_counts in its own transaction, and
+        clearing or restoring bumps teams_version, so the vote count suffices.
+        """
+        return (
+            self.get_teams_version(),
+            self.get_participants_version(),
+            self.get_votes_count(),
+        )
+    
+    def get_turnout_by_team(self):
+        """Members, voted and pending per team (team None: unassigned), in team list order"""
+        version = self.get_data_version()
+        cached = _turnout_by_team.get(self.database_url)
+        if cached is not None and cached[0] == version:
+            record_cache("turnout", True)
+            return cached[1]
+        record_cache("turnout", False)
         
-        for vote in votes.values():
-            for team in vote.get("teams", []):
-                if team in team_votes:
-                    team_votes[team] += 1
+        counts = self.session.execute(turnout_by_team_statement()).all()
         
-        # Sort teams by vote count
-        sorted_teams = sorted(team_votes.items(), key=lambda x: x[1], reverse=True)
+        teams = self.get_teams()
+        totals = {team: [0, 0] for team in teams + [None]}
+        for team, members, voted in counts:
+            # Names no longer in the team list count as unassigned, like get_team_stats
+            row = totals[team if team in totals else None]
+            row[0] += members
+            row[1] += voted
         
-        return {
-            "team_votes": team_votes,
-            "sorted_results": sorted_teams,
-            "total_votes": len(votes)
+        turnout = [{"team": team, "members": members, "voted": voted, "pending": members - voted}
+                   for team, (members, voted) in totals.items() if team is not None or members]
+        _turnout_by_team[self.database_url] = (version, turnout)
+        return turnout
+    
+    def _count_votes_per_minute(self, since=None):
+        """{minute: votes} for votes at or after `since` (all votes if None), in one grouped query"""
+        counts = {}
+        for minute, votes in self.session.execute(votes_per_minute_statement(self.engine.dialect.name, since)):
+            if minute is not None:
+                counts[datetime.fromisoformat(minute) if isinstance(minute, str) else minute] = votes
+        return counts
+    
+    def get_vote_timeline(self):
+        """[(minute, votes)] for every minute with at least one vote, oldest first.
+        
+        Kept per process. A refresh only groups votes from the newest known
+        minute on (it may still have been filling up) and replaces those
+        buckets. A vote stored later with an older voted_at, e.g. drained
+        from the spool, leaves the buckets short of the vote count and
+        forces a full recount.
+        """
+        teams_version, _, votes = self.get_data_version()
+        cached = _vote_timelines.get(self.database_url)
+        if cached is not None and cached["teams_version"] == teams_version:
+            if cached["votes"] == votes:
+                record_cache("timeline", True)
+                return cached["timeline"]
+            buckets = {**cached["buckets"], **self._count_votes_per_minute(cached["watermark"])}
+            if sum(buckets.values()) < votes:
+                buckets = self._count_votes_per_minute()
+        else:
+            buckets = self._count_votes_per_minute()
+        record_cache("timeline", False)
+        
+        timeline = sorted(buckets.items())
+        _vote_timelines[self.database_url] = {
+            "teams_version": teams_version,
+            "votes": votes,
+            "buckets": buckets,
+            "watermark": timeline[-1][0] if timeline else None,
+            "timeline": timeline,
         }
+        return timeline
+    
+    def get_results_data(self):
+        """Get formatted results data"""
+        from utils.tally import tally_ballots
+        
+        ballots = [selected_teams for _, selected_teams, _ in self.iter_votes()]
+        return tally_ballots(self.get_ballot_type(), self.get_teams(), ballots)
+    
+    def _truncate_all(self):
+        """Empty every election table without committing"""
+        tables = [model.__table__ for model in reversed(SNAPSHOT_TABLES + DERIVED_TABLES)]
+        if self.engine.dialect.name == 'postgresql':
+            # One statement, no per-row work and no dead tuples left behind
+            names = ", ".join(table.name for table in tables)
+            self.session.execute(text(f"TRUNCATE TABLE {names}"))
+        else:
+            # SQLite turns an unqualified DELETE into a fast table truncate
+            for table in tables:
+                self.session.execute(table.delete())
+        self.session.expunge_all()
     
     def clear_all_data(self):
         """Clear all data (admin function)"""
-        self.session.query(Vote).delete()
-        self.session.query(Participant).delete()
-        self.session.query(Team).delete()
-        self.session.query(Settings).delete()
-        self.session.commit()
+        # Votes still spooled from before the reset must not drain into the new election
+        spool = self.spool
+        if spool is not None:
+            spool.clear()
+        
+        try:
+            self._truncate_all()
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
         
         # Reinitialize default data
         self.initialize_default_data()
+        self._bump_version('teams_version')
+        self.session.commit()
+        self.settings.invalidate()
+    
+    def export_snapshot(self):
+        """Export the whole election as gzip-compressed JSON bytes"""
+        snapshot = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "exported_at": datetime.now().isoformat(),
+            "tables": {}
+        }
+        
+        for model in SNAPSHOT_TABLES:
+            table = model.__table__
+            columns = [column.name for column in table.columns]
+            rows = self.session.execute(select(table)).all()
+            snapshot["tables"][table.name] = {
+                "columns": columns,
+                "rows": [[value.isoformat() if isinstance(value, datetime) else value for value in row]
+                         for row in rows]
+            }
+        
+        payload = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+        return gzip.compress(payload.encode('utf-8'))
+    
+    def restore_snapshot(self, data):
+        """Replace all election data with a snapshot from export_snapshot"""
+        try:
+            snapshot = json.loads(gzip.decompress(data).decode('utf-8'))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"스냅샷 파일을 읽을 수 없습니다: {e}")
+        
+        # Everything is validated and converted before any existing data is touched
+        table_records = snapshot_records(snapshot)
+        
+        try:
+            self._truncate_all()
+            for table, records in table_records:
+                # executemany: one round trip per table instead of one per row
+                self.session.execute(table.insert(), records)
+            self.session.commit()
+        except (IntegrityError, DataError) as e:
+            self.session.rollback()
+            raise ValueError(f"스냅샷 데이터가 올바르지 않습니다: {e.orig}")
+        except Exception:
+            self.session.rollback()
+            raise
+        
+        # Snapshots from an empty election still need the defaults
+        self.initialize_default_data()
+        
+        # The snapshot may predate voter_hash or come from a server with another key
+        from utils.migrations import sync_voter_hashes
+        sync_voter_hashes(self.engine, force=True)
+        rebuild_pair_counts(self.session.connection())
+        rebuild_vote_counts(self.session.connection())
+        self._bump_version('teams_version')
+        self.session.commit()
+        self.settings.invalidate()
     
     def __del__(self):
         """Close session when object is destroyed"""
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+from utils.auth import compute_voter_hash
+from utils.tally import vote_share_total
+
+# Exports stay in memory up to this size and spill to a temp file beyond it
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# (column name, type) pairs; the type drives the Parquet schema
+PARTICIPANT_COLUMNS = [("email", "string"), ("team", "string"), ("voted", "bool"), ("created_at", "timestamp")]
+VOTE_COLUMNS = [("ballot_no", "int"), ("position", "int"), ("team", "string"), ("score", "int")]
+RESULT_COLUMNS = [("rank", "int"), ("team", "string"), ("votes", "int"), ("percentage", "float")]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+def iter_participant_chunks(db, batch_size=1000):
+    """Yield participant rows with team and voted status, one batch at a time"""
+    for batch in db.stream_participant_rows(batch_size):
+        # Uncached: a full export would otherwise evict every login from the hash cache
+        hashes = {email: compute_voter_hash(email) for email, _, _ in batch}
+        voted = db.get_voted_hashes(hashes.values())
+        yield [(email, team, hashes[email] in voted, created_at)
+               for email, team, created_at in batch]
+
+def iter_vote_chunks(db, batch_size=1000):
+    """Yield anonymized ballots in long format (ballot_no, position, team, score)"""
+    # Numbered in ballot order, never voter-hash or time order: the default hash
+    # is an unkeyed SHA-256 of the email, so hash order could be re-derived
+    # from the participants export and matched to ballot_no.
+    ballot_no = 0
+    for batch in db.stream_ballot_rows(batch_size):
+        rows = []
+        for selected_teams, in batch:
+            ballot_no += 1
+            ballot = json.loads(selected_teams)
+            # Score ballots are {team: score}; other ballots have no score
+            scores = ballot if isinstance(ballot, dict) else {}
+            for position, team in enumerate(ballot, start=1):
+                rows.append((ballot_no, position, team, scores.get(team)))
+        yield rows
+
+def iter_result_chunks(db):
+    """Yield final results ranked by votes as a single batch"""
+    results = db.get_results_data()
+    total = vote_share_total(results)
+    yield [(rank, team, votes, round(votes / total * 100, 2) if total > 0 else 0.0)
+           for rank, (team, votes) in enumerate(results["sorted_results"], start=1)]
+
+def write_csv(chunks, columns):
+    """Write chunks to a spooled CSV file and return it rewound"""
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    # utf-8-sig so Excel opens Korean team names correctly
+    text = io.TextIOWrapper(buffer, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow([name for name, _ in columns])
+    
+    for rows in chunks:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in rows
+        )
+    
+    text.flush()
+    text.detach()
+    buffer.seek(0)
+    return buffer
+
+def write_parquet(chunks, columns):
+    """Write chunks as Parquet row groups to a spooled file and return it rewound"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    arrow_types = {
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "timestamp": pa.timestamp('us'),
+    }
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+    
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    writer = pq.ParquetWriter(buffer, schema)
+    
+    for rows in chunks:
+        if rows:
+            # Each chunk becomes one row group
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    
+    writer.close()
+    buffer.seek(0)
+    return buffer
+
+def export_dataset(db, dataset, fmt="csv", batch_size=1000):
+    """Stream a dataset ('participants', 'votes' or 'results') into a file object"""
+    if dataset == "participants":
+        chunks, columns = iter_participant_chunks(db, batch_size), PARTICIPANT_COLUMNS
+    elif dataset == "votes":
+        chunks, columns = iter_vote_chunks(db, batch_size), VOTE_COLUMNS
+    elif dataset == "results":
+        chunks, columns = iter_result_chunks(db), RESULT_COLUMNS
+    else:
+        raise ValueError(f"Unknown export dataset: {dataset}")
+    
+    if fmt == "csv":
+        return write_csv(chunks, columns)
+    if fmt == "parquet":
+        return write_parquet(chunks, columns)
+    raise ValueError(f"Unknown export format: {fmt}")
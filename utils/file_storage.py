@@ -1,14 +1,25 @@
 import json
 import os
 import threading
+from collections import Counter
 from datetime import datetime
+from utils.auth import hash_email
+from utils.ballots import ballot_type_or_default
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+def _batches(rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
 
 class FileStorage:
     """File-based storage for sharing data across sessions"""
     
     def __init__(self, file_path="voting_data.json"):
         self.file_path = file_path
-        self.lock = threading.Lock()
+        # Reentrant: _read_data rewrites defaults while holding the lock
+        self.lock = threading.RLock()
         self._ensure_file_exists()
     
     def _ensure_file_exists(self):
@@ -56,11 +67,14 @@ class FileStorage:
     def add_participant(self, email, team=None):
         """Add a participant"""
         data = self._read_data()
+        if email in data["participants"]:
+            return False
         data["participants"][email] = {
             "team": team,
             "added_at": datetime.now().isoformat()
         }
         self._write_data(data)
+        return True
     
     def remove_participant(self, email):
         """Remove a participant"""
@@ -75,6 +89,16 @@ class FileStorage:
         if email in data["participants"]:
             data["participants"][email]["team"] = team
             self._write_data(data)
+            return True
+        return False
+    
+    def assign_teams(self, assignments):
+        """Assign teams for many participants with a single write"""
+        data = self._read_data()
+        for email, team in assignments.items():
+            if email in data["participants"]:
+                data["participants"][email]["team"] = team
+        self._write_data(data)
     
     def get_teams(self):
         """Get all teams"""
@@ -101,11 +125,50 @@ class FileStorage:
     def cast_vote(self, email_hash, selected_teams):
         """Cast a vote"""
         data = self._read_data()
+        if email_hash in data["votes"]:
+            return False
         data["votes"][email_hash] = {
             "teams": selected_teams,
             "voted_at": datetime.now().isoformat()
         }
         self._write_data(data)
+        return True
+    
+    def get_voted_hashes(self, email_hashes):
+        """Return the subset of email hashes that have voted"""
+        votes = self.get_votes()
+        return {email_hash for email_hash in email_hashes if email_hash in votes}
+    
+    def stream_participant_rows(self, batch_size=1000):
+        """Yield batches of (email, team, created_at) ordered by email"""
+        participants = self.get_participants()
+        rows = [(email, participants[email].get("team"), _parse_time(participants[email].get("added_at")))
+                for email in sorted(participants)]
+        return _batches(rows, batch_size)
+    
+    def stream_vote_rows(self, batch_size=1000):
+        """Yield batches of (email_hash, selected_teams_json, voted_at) ordered by hash"""
+        votes = self.get_votes()
+        rows = [(email_hash, json.dumps(votes[email_hash].get("teams", []), ensure_ascii=False),
+                 _parse_time(votes[email_hash].get("voted_at")))
+                for email_hash in sorted(votes)]
+        return _batches(rows, batch_size)
+    
+    def stream_ballot_rows(self, batch_size=1000):
+        """Yield batches of (selected_teams_json,) ordered by the ballot itself, as for exports"""
+        ballots = sorted(json.dumps(vote.get("teams", []), ensure_ascii=False) for vote in self.get_votes().values())
+        return _batches([(ballot,) for ballot in ballots], batch_size)
+    
+    def iter_participants(self, batch_size=1000):
+        """Stream participants as (email, team, created_at) tuples"""
+        for batch in self.stream_participant_rows(batch_size):
+            yield from batch
+    
+    def iter_votes(self, batch_size=1000):
+        """Stream votes as (email_hash, selected_teams, voted_at) tuples"""
+        for batch in self.stream_vote_rows(batch_size):
+            for email_hash, selected_teams, voted_at in batch:
+                yield email_hash, json.loads(selected_teams), voted_at
     
     def has_voted(self, email_hash):
         """Check if user has voted"""
@@ -123,11 +186,55 @@ class FileStorage:
         data["show_results"] = show
         self._write_data(data)
     
+    def get_ballot_type(self):
+        """Ballot type of this election"""
+        return ballot_type_or_default(self._read_data().get("ballot_type"))
+    
+    def set_ballot_type(self, ballot_type):
+        """Set the ballot type of this election"""
+        data = self._read_data()
+        data["ballot_type"] = ballot_type
+        self._write_data(data)
+    
+    def get_pair_matrices(self, teams):
+        """(together, ahead) pairwise matrices for `teams`, rebuilt from raw votes"""
+        from utils.pairwise import matrices_from_ballots
+        
+        ballots = [vote.get("teams", []) for vote in self.get_votes().values()]
+        return matrices_from_ballots(self.get_ballot_type(), teams, ballots)
+    
+    def publish_results(self, payload):
+        """Store a new results snapshot and make it the published one"""
+        with self.lock:
+            data = self._read_data()
+            previous = data.get("results_snapshot") or {}
+            version = previous.get("version", 0) + 1
+            data["results_snapshot"] = {**payload, "version": version}
+            self._write_data(data)
+        return version
+    
+    def get_results_snapshot(self):
+        """Get the published results snapshot or None"""
+        return self._read_data().get("results_snapshot")
+    
+    def get_teams_version(self):
+        """Token that changes whenever the team list changes"""
+        return "|".join(self.get_teams())
+    
+    def get_participants_version(self):
+        """Token that changes whenever participants or their teams change"""
+        participants = self.get_participants()
+        return hash(tuple(sorted((email, info.get("team") or "") for email, info in participants.items())))
+    
     def get_user_team(self, email):
         """Get team for specific user"""
         participants = self.get_participants()
         return participants.get(email, {}).get("team")
     
+    def get_voter_team(self, email, known_team=None):
+        """Team to validate a ballot against (always read fresh)"""
+        return self.get_user_team(email)
+    
     def is_email_registered(self, email):
         """Check if email is registered"""
         participants = self.get_participants()
@@ -183,26 +290,33 @@ class FileStorage:
             "unassigned_count": unassigned_count
         }
     
-    def get_results_data(self):
-        """Get formatted results data"""
-        votes = self.get_votes()
-        teams = self.get_teams()
-        
-        # Count votes for each team
-        team_votes = {}
-        for team in teams:
-            team_votes[team] = 0
+    def get_turnout_by_team(self):
+        """Members, voted and pending per team (team None: unassigned), in team list order"""
+        data = self._read_data()
+        teams = data.get("teams", ["팀 1"])
+        votes = data.get("votes", {})
         
-        for vote in votes.values():
-            for team in vote.get("teams", []):
-                if team in team_votes:
-                    team_votes[team] += 1
+        totals = {team: [0, 0] for team in teams + [None]}
+        for email, participant in data.get("participants", {}).items():
+            team = participant.get("team")
+            row = totals[team if team in totals else None]
+            row[0] += 1
+            row[1] += hash_email(email) in votes
         
-        # Sort teams by vote count
-        sorted_teams = sorted(team_votes.items(), key=lambda x: x[1], reverse=True)
+        return [{"team": team, "members": members, "voted": voted, "pending": members - voted}
+                for team, (members, voted) in totals.items() if team is not None or members]
+    
+    def get_vote_timeline(self):
+        """[(minute, votes)] for every minute with at least one vote, oldest first"""
+        minutes = Counter(
+            datetime.fromisoformat(vote["voted_at"]).replace(second=0, microsecond=0)
+            for vote in self.get_votes().values() if vote.get("voted_at")
+        )
+        return sorted(minutes.items())
+    
+    def get_results_data(self):
+        """Get formatted results data"""
+        from utils.tally import tally_ballots
         
-        return {
-            "team_votes": team_votes,
-            "sorted_results": sorted_teams,
-            "total_votes": len(votes)
-        }
\ No newline at end of file
+        ballots = [vote.get("teams", []) for vote in self.get_votes().values()]
+        return tally_ballots(self.get_ballot_type(), self.get_teams(), ballots)
\ No newline at end of file
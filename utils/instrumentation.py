@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+
+logger = logging.getLogger("election.queries")
+
+# Statements slower than this are logged individually and flagged in reports
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+_DB_MANAGER_FILE = os.path.join("utils", "db_manager.py")
+
+_state = {"enabled": os.getenv("QUERY_INSTRUMENTATION", "").lower() in ("1", "true", "yes")}
+_local = threading.local()
+_recent_reports = deque(maxlen=50)
+_reports_lock = threading.Lock()
+
+def is_enabled():
+    """Check whether query instrumentation is on for this process"""
+    return _state["enabled"]
+
+def set_enabled(enabled):
+    """Turn query instrumentation on or off for this process"""
+    _state["enabled"] = bool(enabled)
+    if enabled:
+        _ensure_log_handler()
+
+def _ensure_log_handler():
+    """Make sure per-rerun log lines are visible even without logging config"""
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+def instrument_engine(engine):
+    """Attach statement counting/timing listeners to an engine (idempotent)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "report", None) is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    report = getattr(_local, "report", None)
+    started = conn.info.get("query_started")
+    if report is None or not started:
+        return
+
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    method, page = _attribute_caller()
+    report.record(statement, elapsed_ms, method, page)
+
+def _attribute_caller():
+    """Find the outermost DatabaseManager method and innermost render_* function on the stack"""
+    method = None
+    page = None
+    frame = sys._getframe(2)
+
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.endswith(_DB_MANAGER_FILE):
+            method = code.co_name
+        elif page is None and code.co_name.startswith("render_"):
+            page = code.co_name
+        frame = frame.f_back
+
+    return method or "(direct)", page or "(app)"
+
+class RerunReport:
+    """Statement counts and timings for a single Streamlit rerun"""
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.query_ms = 0.0
+        self.by_caller = {}
+        self.slow_queries = []
+
+    def record(self, statement, elapsed_ms, method, page):
+        """Add one executed statement to the report"""
+        self.statements += 1
+        self.query_ms += elapsed_ms
+
+        entry = self.by_caller.setdefault((page, method), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed_ms
+
+        if elapsed_ms >= SLOW_QUERY_MS:
+            sql = " ".join(statement.split())[:200]
+            self.slow_queries.append({"page": page, "method": method, "ms": round(elapsed_ms, 2), "sql": sql})
+            logger.warning("slow_query %s", json.dumps(self.slow_queries[-1], ensure_ascii=False))
+
+    def to_dict(self):
+        """Summarize the rerun as a JSON-serializable dict"""
+        callers = sorted(self.by_caller.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "label": self.label,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "rerun_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "statements": self.statements,
+            "query_ms": round(self.query_ms, 2),
+            "slow_threshold_ms": SLOW_QUERY_MS,
+            "slow_queries": self.slow_queries,
+            "callers": [
+                {"page": page, "method": method, "statements": count, "ms": round(ms, 2)}
+                for (page, method), (count, ms) in callers
+            ],
+        }
+
+@contextmanager
+def track_rerun(label):
+    """Collect a query budget report for the enclosed rerun when enabled"""
+    if not _state["enabled"]:
+        yield None
+        return
+
+    _ensure_log_handler()
+    report = RerunReport(label)
+    _local.report = report
+    try:
+        yield report
+    finally:
+        _local.report = None
+        summary = report.to_dict()
+        with _reports_lock:
+            _recent_reports.append(summary)
+        logger.info("query_budget %s", json.dumps(summary, ensure_ascii=False))
+
+def get_recent_reports():
+    """Most recent rerun reports, newest first"""
+    with _reports_lock:
+        return list(reversed(_recent_reports))
@@ -0,0 +1,263 @@
+import bisect
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("election.metrics")
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """Base class holding name, help text and label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self):
+        """Yield (suffix, label values, extra labels, value) tuples"""
+        return []
+
+    def render(self):
+        """Render this metric in the Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", key, (), value) for key, value in sorted(items)]
+
+class Gauge(Metric):
+    """Point-in-time value, either set directly or read from a callback at exposition time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self._callback is not None:
+            # Callback returns {label values tuple: value}
+            items = list(self._callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [("", key, (), value) for key, value in sorted(items)]
+
+class Histogram(Metric):
+    """Bucketed distribution with sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+
+        samples = []
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", key, (("le", _format_value(float(bound))),), cumulative))
+            samples.append(("_sum", key, (), total))
+            samples.append(("_count", key, (), count))
+        return samples
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every registered metric in the Prometheus text format"""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+REGISTRY = Registry()
+
+# Objects sampled at exposition time; weak so closed sessions drop out
+_engines = weakref.WeakSet()
+_sessions = weakref.WeakSet()
+
+def track_engine(engine):
+    """Report this engine's connection pool in the pool gauge"""
+    _engines.add(engine)
+
+def track_session(data_manager):
+    """Count this DataManager as an active session"""
+    _sessions.add(data_manager)
+
+def _pool_usage():
+    usage = {}
+    for engine in list(_engines):
+        pool = engine.pool
+        for state, reader in (("checked_out", "checkedout"), ("size", "size"), ("overflow", "overflow")):
+            method = getattr(pool, reader, None)
+            if method is not None:
+                key = (engine.url.get_backend_name(), state)
+                # QueuePool reports negative overflow while below its core size
+                usage[key] = usage.get(key, 0) + max(0, method())
+    return usage
+
+VOTES_CAST = REGISTRY.register(Counter(
+    "election_votes_cast_total", "Vote submissions by outcome", ("outcome",)))
+LOGIN_ATTEMPTS = REGISTRY.register(Counter(
+    "election_login_attempts_total", "Login attempts by role and outcome", ("role", "outcome")))
+CAST_VOTE_SECONDS = REGISTRY.register(Histogram(
+    "election_cast_vote_duration_seconds", "DataManager.cast_vote latency", ("outcome",)))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "election_cache_requests_total", "Cache lookups by cache and result", ("cache", "result")))
+DB_POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "election_db_pool_connections", "Database pool connections by state", ("backend", "state"),
+    callback=_pool_usage))
+ACTIVE_SESSIONS = REGISTRY.register(Gauge(
+    "election_active_sessions", "Live Streamlit sessions holding a DataManager",
+    callback=lambda: {(): len(_sessions)}))
+
+def record_cache(cache, hit):
+    """Count a cache hit or miss"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+def write_metrics_file(path):
+    """Atomically write the current metrics to a file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, encoding="utf-8") as handle:
+        handle.write(REGISTRY.render())
+    os.replace(handle.name, path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would otherwise flood stderr
+        pass
+
+# Seconds to wait before trying to bind METRICS_PORT again after a failure
+EXPORTER_RETRY_SECONDS = 60
+
+_http_exporter = None
+_http_retry_at = 0.0
+_file_exporter_started = False
+_exporters_lock = threading.Lock()
+
+def _start_http_exporter(port):
+    """Bind and serve /metrics; returns the server, or None (logged) if the port is unavailable"""
+    global _http_retry_at
+    host = os.getenv("METRICS_HOST", "127.0.0.1")
+    try:
+        server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    except (OSError, ValueError) as e:
+        _http_retry_at = time.monotonic() + EXPORTER_RETRY_SECONDS
+        logger.warning("metrics exporter could not listen on %s:%s (%s); retrying in %ss",
+                       host, port, e, EXPORTER_RETRY_SECONDS)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+def start_exporters():
+    """Start the /metrics endpoint (METRICS_PORT) and file dump (METRICS_FILE) once per process.
+    
+    Cheap to call on every rerun; an exporter that failed to start is retried
+    after EXPORTER_RETRY_SECONDS instead of raising into the page.
+    """
+    global _http_exporter, _file_exporter_started
+    port = os.getenv("METRICS_PORT")
+    path = os.getenv("METRICS_FILE")
+    if (_http_exporter is not None or not port) and (_file_exporter_started or not path):
+        return
+    
+    with _exporters_lock:
+        if port and _http_exporter is None and time.monotonic() >= _http_retry_at:
+            _http_exporter = _start_http_exporter(port)
+        
+        if path and not _file_exporter_started:
+            interval = float(os.getenv("METRICS_DUMP_INTERVAL", "15"))
+
+            def dump_forever():
+                while True:
+                    try:
+                        write_metrics_file(path)
+                    except OSError as e:
+                        logger.warning("could not write metrics file %s: %s", path, e)
+                    time.sleep(interval)
+
+            threading.Thread(target=dump_forever, name="metrics-file", daemon=True).start()
+            _file_exporter_started = True
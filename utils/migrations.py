@@ -0,0 +1,218 @@
+"""Versioned, idempotent schema migrations.
+
+Applied once per process when the first engine for a database URL is
+created (see db_manager.get_engine), or ahead of deployment with:
+
+    python -m utils.migrations            # apply pending migrations
+    python -m utils.migrations status     # list applied/pending versions
+    python -m utils.migrations rekey      # re-derive voter hashes after changing VOTER_HASH_SECRET
+    python -m utils.migrations pairs      # rebuild pair and vote counts from raw votes
+"""
+import os
+import sys
+import threading
+from datetime import datetime
+from sqlalchemy import select, text, update, bindparam, inspect
+from sqlalchemy.exc import IntegrityError
+from utils.auth import hash_email, legacy_hash_email, voter_hash_key_id
+from utils.db_manager import Participant, Team, Vote, Settings, ResultsSnapshot, PairCount, VoteCount, SchemaVersion, rebuild_pair_counts, rebuild_vote_counts, touch_settings_version
+
+# Arbitrary constant key for the cross-process PostgreSQL advisory lock
+_ADVISORY_LOCK_KEY = 724_001
+
+MIGRATIONS = []
+_lock = threading.Lock()
+
+def migration(version, description):
+    """Register a migration; each must be safe to re-run"""
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return register
+
+@migration(1, "Create participants, teams, votes and settings tables")
+def _create_base_tables(connection):
+    tables = [model.__table__ for model in (Participant, Team, Vote, Settings)]
+    Participant.metadata.create_all(connection, tables=tables, checkfirst=True)
+
+@migration(2, "Seed default team and show_results setting")
+def _seed_defaults(connection):
+    if connection.execute(select(Team.name).limit(1)).first() is None:
+        connection.execute(Team.__table__.insert().values(name="팀 1", created_at=datetime.now()))
+    
+    if connection.execute(select(Settings.key).where(Settings.key == 'show_results')).first() is None:
+        connection.execute(Settings.__table__.insert().values(
+            key='show_results', value='false', updated_at=datetime.now()
+        ))
+
+@migration(3, "Index participants.team and votes.voted_at")
+def _index_team_and_voted_at(connection):
+    for column in (Participant.__table__.c.team, Vote.__table__.c.voted_at):
+        for index in column.table.indexes:
+            if list(index.columns) == [column]:
+                index.create(connection, checkfirst=True)
+
+@migration(4, "Create results_snapshots table")
+def _create_results_snapshots(connection):
+    ResultsSnapshot.__table__.create(connection, checkfirst=True)
+
+@migration(5, "Add participants.voter_hash")
+def _add_voter_hash(connection):
+    columns = {column["name"] for column in inspect(connection).get_columns("participants")}
+    if "voter_hash" not in columns:
+        connection.execute(text("ALTER TABLE participants ADD COLUMN voter_hash VARCHAR"))
+    
+    column = Participant.__table__.c.voter_hash
+    for index in Participant.__table__.indexes:
+        if list(index.columns) == [column]:
+            index.create(connection, checkfirst=True)
+    # Values are filled in by sync_voter_hashes, which also re-keys existing votes
+
+@migration(6, "Create pair_counts table and fill it from existing votes")
+def _create_pair_counts(connection):
+    PairCount.__table__.create(connection, checkfirst=True)
+    rebuild_pair_counts(connection)
+
+@migration(7, "Create vote_counts table and fill it from existing votes")
+def _create_vote_counts(connection):
+    VoteCount.__table__.create(connection, checkfirst=True)
+    rebuild_vote_counts(connection)
+
+def _lock_for_migration(connection):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+
+def sync_voter_hashes(engine, force=False):
+    """Store every participant's voter hash and re-key their votes when the key changed.
+
+    Votes are matched through the previously stored voter_hash, so switching
+    from plain SHA-256 to VOTER_HASH_SECRET (or rotating the secret) keeps
+    every ballot attached to the same participant. Returns the number of
+    participants whose hash changed.
+    """
+    key_id = voter_hash_key_id()
+    
+    with engine.begin() as connection:
+        _lock_for_migration(connection)
+        
+        stored_key = connection.execute(
+            select(Settings.value).where(Settings.key == 'voter_hash_key')
+        ).scalar()
+        missing = connection.execute(
+            select(Participant.email).where(Participant.voter_hash.is_(None)).limit(1)
+        ).first()
+        if stored_key == key_id and missing is None and not force:
+            return 0
+        
+        changes = []
+        for email, current in connection.execute(select(Participant.email, Participant.voter_hash)):
+            new = hash_email(email)
+            if current != new:
+                # Rows without a stored hash predate it, so their votes used plain SHA-256
+                changes.append({"b_email": email, "b_old": current or legacy_hash_email(email), "b_new": new})
+        
+        if changes:
+            connection.execute(
+                update(Participant.__table__)
+                .where(Participant.__table__.c.email == bindparam("b_email"))
+                .values(voter_hash=bindparam("b_new")),
+                changes
+            )
+            connection.execute(
+                update(Vote.__table__)
+                .where(Vote.__table__.c.email_hash == bindparam("b_old"))
+                .values(email_hash=bindparam("b_new")),
+                changes
+            )
+        
+        values = {"value": key_id, "updated_at": datetime.now()}
+        if stored_key is None:
+            connection.execute(Settings.__table__.insert().values(key='voter_hash_key', **values))
+        else:
+            connection.execute(
+                Settings.__table__.update().where(Settings.__table__.c.key == 'voter_hash_key').values(**values)
+            )
+        # Running app processes reload their settings cache
+        touch_settings_version(connection)
+    
+    return len(changes)
+
+def _applied_versions(connection):
+    return set(connection.execute(select(SchemaVersion.version)).scalars())
+
+def ensure_schema(engine):
+    """Apply pending migrations in order; returns the versions applied now"""
+    applied_now = []
+    
+    with _lock:
+        SchemaVersion.__table__.create(engine, checkfirst=True)
+        
+        with engine.connect() as connection:
+            applied = _applied_versions(connection)
+        
+        for version, description, func in MIGRATIONS:
+            if version in applied:
+                continue
+            
+            try:
+                with engine.begin() as connection:
+                    if engine.dialect.name == 'postgresql':
+                        # Serialize migrating processes, then re-check under the lock
+                        _lock_for_migration(connection)
+                        if version in _applied_versions(connection):
+                            continue
+                    
+                    func(connection)
+                    connection.execute(SchemaVersion.__table__.insert().values(
+                        version=version, description=description, applied_at=datetime.now()
+                    ))
+                applied_now.append(version)
+            except IntegrityError:
+                # Another process recorded this version first; its work is already committed
+                continue
+        
+        sync_voter_hashes(engine)
+    
+    return applied_now
+
+def schema_status(engine):
+    """List (version, description, applied_at or None) for every known migration"""
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = {row.version: row.applied_at for row in connection.execute(select(SchemaVersion))}
+    return [(version, description, applied.get(version)) for version, description, _ in MIGRATIONS]
+
+def main(argv):
+    from sqlalchemy import create_engine
+    
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("DATABASE_URL environment variable not found", file=sys.stderr)
+        return 1
+    
+    engine = create_engine(database_url)
+    command = argv[0] if argv else "upgrade"
+    
+    if command == "upgrade":
+        applied = ensure_schema(engine)
+        print(f"applied: {applied}" if applied else "schema is up to date")
+    elif command == "rekey":
+        changed = sync_voter_hashes(engine, force=True)
+        print(f"re-keyed {changed} participants")
+    elif command == "pairs":
+        with engine.begin() as connection:
+            rebuild_pair_counts(connection)
+            rebuild_vote_counts(connection)
+        print("rebuilt pair counts and votes count")
+    elif command == "status":
+        for version, description, applied_at in schema_status(engine):
+            state = applied_at.isoformat(timespec='seconds') if applied_at else "pending"
+            print(f"{version:>4}  {state:20}  {description}")
+    else:
+        print(f"unknown command: {command} (use upgrade, status, rekey or pairs)", file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,134 @@
+from itertools import chain, combinations
+import numpy as np
+from utils.tally import encode_ballots
+
+# Pair rows are keyed by (team_a, team_b) with team_a <= team_b. The diagonal
+# row (team, team) counts ballots choosing the team; off-diagonal rows count
+# ballots choosing both (together) and, within those, which one the ballot
+# ranked or scored strictly higher (a_over_b, b_over_a). A team a voter chose
+# is preferred to any team they did not choose, so the full pairwise
+# preference matrix follows from these counts without storing T x T per vote.
+PAIR_FIELDS = ("together", "a_over_b", "b_over_a")
+
+def _preference_keys(ballot_type, ballot):
+    """Per chosen team, a key where lower means preferred (None: no order)"""
+    if ballot_type == "ranked":
+        return {team: position for position, team in enumerate(ballot)}
+    if ballot_type == "score":
+        return {team: -score for team, score in ballot.items()}
+    return None
+
+def ballot_pairs(ballot_type, ballot):
+    """Pair-count deltas for one ballot: {(team_a, team_b): (together, a_over_b, b_over_a)}"""
+    teams = sorted(ballot)
+    keys = _preference_keys(ballot_type, ballot)
+    pairs = {(team, team): (1, 0, 0) for team in teams}
+    for team_a, team_b in combinations(teams, 2):
+        if keys is None or keys[team_a] == keys[team_b]:
+            pairs[(team_a, team_b)] = (1, 0, 0)
+        elif keys[team_a] < keys[team_b]:
+            pairs[(team_a, team_b)] = (1, 1, 0)
+        else:
+            pairs[(team_a, team_b)] = (1, 0, 1)
+    return pairs
+
+def merge_ballot_pairs(ballot_type, ballots):
+    """Summed pair-count rows for many ballots, ready to insert or upsert"""
+    totals = {}
+    for ballot in ballots:
+        for key, counts in ballot_pairs(ballot_type, ballot).items():
+            current = totals.get(key)
+            totals[key] = counts if current is None else tuple(a + b for a, b in zip(current, counts))
+    return [{"team_a": team_a, "team_b": team_b, **dict(zip(PAIR_FIELDS, counts))}
+            for (team_a, team_b), counts in totals.items()]
+
+def matrices_from_ballots(ballot_type, teams, ballots):
+    """Vectorized (together, ahead) T x T matrices straight from raw ballots.
+
+    together[a, b]: ballots choosing both (diagonal: ballots choosing a).
+    ahead[a, b]: ballots choosing both that put a strictly above b.
+    """
+    ballots = ballots if isinstance(ballots, list) else list(ballots)
+    n_teams = len(teams)
+    codes, lengths, scores = encode_ballots(ballots, teams, scored=ballot_type == "score")
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+
+    chosen = np.zeros((len(lengths), n_teams), dtype=np.int32)
+    chosen[rows, codes] = 1
+    together = chosen.T @ chosen
+
+    ahead = np.zeros((n_teams, n_teams), dtype=np.int64)
+    if ballot_type in ("ranked", "score"):
+        if ballot_type == "ranked":
+            offsets = np.cumsum(lengths) - lengths
+            keys = np.arange(len(codes)) - np.repeat(offsets, lengths)
+        else:
+            keys = -scores
+        # Unchosen teams sort after every chosen one; they are masked out below anyway
+        rank = np.full((len(lengths), n_teams), np.iinfo(np.int64).max)
+        rank[rows, codes] = keys
+        mask = chosen.astype(bool)
+        for team in range(n_teams):
+            beats = mask[:, team, None] & mask & (rank[:, team, None] < rank)
+            ahead[team] = beats.sum(axis=0)
+    return together.astype(np.int64), ahead
+
+def matrices_from_rows(teams, rows):
+    """(together, ahead) matrices for `teams` from stored pair rows; other teams are ignored"""
+    index = {team: position for position, team in enumerate(teams)}
+    together = np.zeros((len(teams), len(teams)), dtype=np.int64)
+    ahead = np.zeros_like(together)
+    for team_a, team_b, count, a_over_b, b_over_a in rows:
+        a, b = index.get(team_a), index.get(team_b)
+        if a is None or b is None:
+            continue
+        together[a, b] = together[b, a] = count
+        if a != b:
+            ahead[a, b] = a_over_b
+            ahead[b, a] = b_over_a
+    return together, ahead
+
+def pair_rows_from_matrices(teams, together, ahead):
+    """Inverse of matrices_from_rows, for rebuilding the stored table"""
+    order = sorted(range(len(teams)), key=teams.__getitem__)
+    rows = []
+    for i, a in enumerate(order):
+        for b in order[i:]:
+            if together[a, b]:
+                rows.append({"team_a": teams[a], "team_b": teams[b], "together": int(together[a, b]),
+                             "a_over_b": int(ahead[a, b]) if a != b else 0,
+                             "b_over_a": int(ahead[b, a]) if a != b else 0})
+    return rows
+
+def ballot_teams(ballots):
+    """Every team name mentioned by some ballot"""
+    return sorted(set(chain.from_iterable(ballots)))
+
+def pairwise_summary(teams, together, ahead, total_ballots, top_pairs=5):
+    """Copeland ranking, Condorcet winner and most frequent pairs (JSON-serializable)"""
+    chosen = np.diag(together)
+    # a over b: ranked/scored above b on ballots choosing both, or chosen while b was not
+    preference = ahead + (chosen[:, None] - together)
+    np.fill_diagonal(preference, 0)
+
+    wins = (preference > preference.T).sum(axis=1)
+    losses = (preference < preference.T).sum(axis=1)
+    ties = len(teams) - 1 - wins - losses
+    copeland = wins + 0.5 * ties
+    order = np.lexsort((-chosen, -copeland))
+
+    condorcet = [teams[team] for team in range(len(teams)) if len(teams) > 1 and wins[team] == len(teams) - 1]
+
+    upper_a, upper_b = np.triu_indices(len(teams), k=1)
+    counts = together[upper_a, upper_b]
+    frequent = [position for position in np.argsort(-counts, kind="stable")[:top_pairs] if counts[position] > 0]
+
+    return {
+        "copeland": [{"team": teams[team], "score": float(copeland[team]), "wins": int(wins[team]),
+                      "losses": int(losses[team]), "ties": int(ties[team])} for team in order],
+        "condorcet_winner": condorcet[0] if condorcet else None,
+        "pairs": [{"teams": [teams[upper_a[position]], teams[upper_b[position]]],
+                   "together": int(counts[position]),
+                   "share": round(float(counts[position]) / total_ballots * 100, 1) if total_ballots else 0.0}
+                  for position in frequent],
+    }
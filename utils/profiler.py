@@ -0,0 +1,85 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+
+# Number of most recent samples kept per section for percentile estimates
+PROFILE_WINDOW = int(os.getenv("PROFILE_WINDOW", "500"))
+
+_state = {"enabled": os.getenv("RENDER_PROFILING", "").lower() in ("1", "true", "yes")}
+_samples = {}
+_lock = threading.Lock()
+
+def is_enabled():
+    """Check whether render profiling is on for this process"""
+    return _state["enabled"]
+
+def set_enabled(enabled):
+    """Turn render profiling on or off for this process"""
+    _state["enabled"] = bool(enabled)
+
+def reset():
+    """Drop all collected samples"""
+    with _lock:
+        _samples.clear()
+
+def _record(section, elapsed_ms):
+    with _lock:
+        window = _samples.get(section)
+        if window is None:
+            window = _samples[section] = deque(maxlen=PROFILE_WINDOW)
+        window.append(elapsed_ms)
+
+class PageTimer:
+    """Lap timer: each lap records the time since the previous lap under a section name"""
+
+    __slots__ = ("page", "last")
+
+    def __init__(self, page):
+        self.page = page
+        self.last = time.perf_counter()
+
+    def lap(self, section):
+        """Close the current section and start timing the next one"""
+        now = time.perf_counter()
+        _record(f"{self.page}.{section}", (now - self.last) * 1000)
+        self.last = now
+
+class _NoopTimer:
+    """Stand-in used when profiling is off; lap does nothing"""
+
+    __slots__ = ()
+
+    def lap(self, section):
+        pass
+
+_NOOP_TIMER = _NoopTimer()
+
+def page_timer(page):
+    """Start timing a render function (a shared no-op when profiling is off)"""
+    return PageTimer(page) if _state["enabled"] else _NOOP_TIMER
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    # round() first so 0.95 * 100 cannot land just above 95 and skip a rank
+    index = min(len(ordered) - 1, max(0, math.ceil(round(fraction * len(ordered), 9)) - 1))
+    return ordered[index]
+
+def get_section_stats():
+    """Rolling count/p50/p95/p99 per section in milliseconds, slowest p95 first"""
+    with _lock:
+        snapshot = {section: sorted(window) for section, window in _samples.items()}
+
+    stats = []
+    for section, ordered in snapshot.items():
+        if not ordered:
+            continue
+        stats.append({
+            "section": section,
+            "count": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.50), 2),
+            "p95_ms": round(_percentile(ordered, 0.95), 2),
+            "p99_ms": round(_percentile(ordered, 0.99), 2),
+        })
+    return sorted(stats, key=lambda row: row["p95_ms"], reverse=True)
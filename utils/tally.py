@@ -0,0 +1,120 @@
+from collections import defaultdict
+from itertools import chain
+import numpy as np
+
+def encode_ballots(ballots, teams, scored=False):
+    """Compact NumPy form of stored ballots.
+
+    Ballots are lists of team names, or {team: score} dicts when `scored`.
+    Returns `codes` (int16 team index per choice, ballots concatenated),
+    `lengths` (choices per ballot) and `scores` (per choice, or None).
+    Names no longer in `teams` are dropped, as if nobody had chosen them.
+    """
+    ballots = ballots if isinstance(ballots, list) else list(ballots)
+    lengths = np.fromiter(map(len, ballots), dtype=np.int32, count=len(ballots))
+    total = int(lengths.sum())
+
+    index = defaultdict(lambda: -1, {team: position for position, team in enumerate(teams)})
+    codes = np.fromiter(map(index.__getitem__, chain.from_iterable(ballots)), dtype=np.int16, count=total)
+    scores = None
+    if scored:
+        scores = np.fromiter(chain.from_iterable(ballot.values() for ballot in ballots), dtype=np.int64, count=total)
+
+    keep = codes >= 0
+    if not keep.all():
+        rows = np.repeat(np.arange(len(ballots)), lengths)
+        lengths = np.bincount(rows[keep], minlength=len(ballots)).astype(np.int32)
+        codes = codes[keep]
+        if scored:
+            scores = scores[keep]
+    return codes, lengths, scores
+
+def rank_matrix(codes, lengths, n_teams):
+    """Pad ranked ballots into a (ballots x longest+1) matrix; padding is n_teams"""
+    width = int(lengths.max(initial=0)) + 1
+    matrix = np.full((len(lengths), width), n_teams, dtype=np.int16)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    matrix[rows, np.arange(len(codes)) - np.repeat(offsets, lengths)] = codes
+    return matrix
+
+def instant_runoff(matrix, n_teams):
+    """Instant-runoff rounds over a rank matrix.
+
+    Each ballot keeps a pointer to its highest-ranked team still in the
+    race; eliminating a team only advances the ballots that pointed at it,
+    so every ballot is walked at most once across all rounds. The lowest
+    team is eliminated each round (ties: fewer first-round votes, then later
+    in the team list) until a team holds a majority of the ballots still
+    counting. Returns (finish order, [{team: votes} per round], each team's
+    votes in the last round it took part in).
+    """
+    active = np.ones(n_teams + 1, dtype=bool)
+    active[n_teams] = False
+    position = np.zeros(len(matrix), dtype=np.intp)
+    top = matrix[:, 0].astype(np.intp)
+
+    rounds = []
+    eliminated = []
+    last_counts = np.zeros(n_teams, dtype=np.int64)
+    first_counts = None
+    while True:
+        counts = np.bincount(top, minlength=n_teams + 1)[:n_teams]
+        if first_counts is None:
+            first_counts = counts
+        remaining = np.flatnonzero(active[:n_teams])
+        last_counts[remaining] = counts[remaining]
+        rounds.append({int(team): int(counts[team]) for team in remaining})
+
+        continuing = int(counts[remaining].sum())
+        if len(remaining) <= 1 or continuing == 0 or counts[remaining].max() * 2 > continuing:
+            break
+
+        loser = min(remaining, key=lambda team: (counts[team], first_counts[team], -team))
+        active[loser] = False
+        eliminated.append(int(loser))
+
+        # Move ballots off the eliminated team to their next choice still running
+        moving = np.flatnonzero(top == loser)
+        while moving.size:
+            position[moving] += 1
+            top[moving] = matrix[moving, position[moving]]
+            moving = moving[~active[top[moving]] & (top[moving] != n_teams)]
+
+    finishers = sorted(np.flatnonzero(active[:n_teams]), key=lambda team: (-last_counts[team], team))
+    return [int(team) for team in finishers] + eliminated[::-1], rounds, last_counts
+
+def tally_ballots(ballot_type, teams, ballots):
+    """Results for any ballot type, in the get_results_data format.
+
+    `sorted_results` lists (team, value) best first: selections for
+    pick_two/approval, total points for score, and for ranked the finish
+    order with each team's votes in the last round it took part in.
+    Ranked results also carry `rounds`, a list of {team: votes} per round.
+    """
+    codes, lengths, scores = encode_ballots(ballots, teams, scored=ballot_type == "score")
+    n_teams = len(teams)
+    results = {"total_votes": len(lengths), "ballot_type": ballot_type}
+
+    if ballot_type == "ranked":
+        order, rounds, values = instant_runoff(rank_matrix(codes, lengths, n_teams), n_teams)
+        results["rounds"] = [{teams[team]: votes for team, votes in counts.items()} for counts in rounds]
+    else:
+        values = np.bincount(codes, weights=scores, minlength=n_teams).astype(np.int64)
+        # Stable, so ties keep team list order like the original sorted()
+        order = np.argsort(-values, kind="stable")
+
+    results["team_votes"] = {team: int(values[position]) for position, team in enumerate(teams)}
+    results["sorted_results"] = [(teams[team], int(values[team])) for team in order]
+    return results
+
+def vote_share_total(results):
+    """Denominator for vote shares in get_results_data output.
+
+    Ranked results divide by the number of ballots: team_votes holds each
+    team's last-round count, and transferred ballots appear in several of
+    those. Other types divide by all selections (or points) received.
+    """
+    if results.get("ballot_type") == "ranked":
+        return results["total_votes"]
+    return sum(results["team_votes"].values())
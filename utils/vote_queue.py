@@ -0,0 +1,75 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from utils.metrics import REGISTRY, Histogram
+
+# VOTE_GROUP_COMMIT=1 routes votes through one background writer per process
+VOTE_GROUP_COMMIT = os.getenv('VOTE_GROUP_COMMIT', '').lower() in ('1', 'true', 'yes')
+VOTE_BATCH_SIZE = int(os.getenv('VOTE_BATCH_SIZE', '64'))
+VOTE_BATCH_DELAY = float(os.getenv('VOTE_BATCH_DELAY_MS', '5')) / 1000
+
+VOTE_BATCH_ROWS = REGISTRY.register(Histogram(
+    "election_vote_batch_rows", "Votes committed per group-commit batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)))
+
+class VoteWriter:
+    """Background thread committing queued votes in small batches.
+
+    `write_batch` receives a list of (email_hash, selected_teams, voted_at)
+    and returns the set of email hashes it stored. Every submitter waits on
+    its own Future, resolved with True (stored) or False (already voted).
+    `reset` is called after a failed batch (e.g. the session's rollback) so
+    one database error does not poison every later batch.
+    """
+
+    def __init__(self, write_batch, max_batch=VOTE_BATCH_SIZE, max_delay=VOTE_BATCH_DELAY, reset=None):
+        self.write_batch = write_batch
+        self.reset = reset
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="vote-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, email_hash, selected_teams):
+        """Queue a vote; the Future resolves once its batch is committed"""
+        future = Future()
+        self._queue.put((email_hash, selected_teams, datetime.now(), future))
+        return future
+
+    def _collect(self):
+        """Block for the first vote, then gather more until the batch is full or the delay passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                stored = self.write_batch([(email_hash, teams, voted_at) for email_hash, teams, voted_at, _ in batch])
+            except Exception as error:
+                if self.reset is not None:
+                    try:
+                        self.reset()
+                    except Exception:
+                        # Still fail the batch; the next one tries again
+                        pass
+                for *_, future in batch:
+                    future.set_exception(error)
+                continue
+
+            VOTE_BATCH_ROWS.observe(len(batch))
+            # A hash queued twice in one batch is stored once; later copies are duplicates
+            for email_hash, _, _, future in batch:
+                future.set_result(email_hash in stored)
+                stored.discard(email_hash)
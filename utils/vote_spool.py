@@ -0,0 +1,247 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from utils.metrics import REGISTRY, Counter, Gauge
+
+# VOTE_SPOOL_PATH=/var/lib/election/spool.db accepts votes locally while the primary database is down
+VOTE_SPOOL_PATH = os.getenv('VOTE_SPOOL_PATH')
+# How long to skip the primary after a failure before trying it again (seconds)
+VOTE_SPOOL_RETRY_SECONDS = float(os.getenv('VOTE_SPOOL_RETRY_SECONDS', '5'))
+VOTE_SPOOL_DRAIN_BATCH = int(os.getenv('VOTE_SPOOL_DRAIN_BATCH', '500'))
+
+logger = logging.getLogger("election.spool")
+
+# Spools started in this process, for the pending gauge
+_spools = []
+
+VOTES_SPOOLED = REGISTRY.register(Counter(
+    "election_votes_spooled_total", "Votes accepted into, drained from or quarantined in the local spool", ("event",)))
+
+class VoteSpool:
+    """Durable local vote store used while the primary database is unavailable.
+
+    Votes live in a small SQLite file (fsync on every commit) keyed by email
+    hash, so each voter is accepted at most once locally. A background thread
+    drains them to the primary in batches with `drain_batch`, which must be
+    idempotent: it receives (email_hash, selected_teams, voted_at) tuples and
+    may skip hashes the primary already has. Drained rows are then deleted.
+    `reset` runs on the drain thread after a failed drain (e.g. the drain
+    session's rollback) so a dropped connection does not block later drains.
+    Only errors `unavailable(error)` accepts mark the primary down; a batch
+    failing for any other reason is retried row by row and the rows that
+    still fail move to quarantined_votes, so one bad row cannot stall the
+    spool. Without `unavailable`, every error counts as an outage.
+    """
+
+    def __init__(self, path, drain_batch, retry_seconds=VOTE_SPOOL_RETRY_SECONDS, batch_size=VOTE_SPOOL_DRAIN_BATCH,
+                 reset=None, unavailable=None):
+        self.path = path
+        self.drain_batch = drain_batch
+        self.reset = reset
+        self.unavailable = unavailable
+        self.retry_seconds = retry_seconds
+        self.batch_size = batch_size
+        self.primary_down_until = 0.0
+        self._lock = threading.Lock()
+        # Held while a batch is on its way to the primary, so clear() cannot race it
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS spooled_votes ("
+                    "email_hash TEXT PRIMARY KEY, selected_teams TEXT NOT NULL, voted_at TEXT NOT NULL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS quarantined_votes ("
+                    "email_hash TEXT PRIMARY KEY, selected_teams TEXT NOT NULL, voted_at TEXT NOT NULL, "
+                    "error TEXT NOT NULL, quarantined_at TEXT NOT NULL)"
+                )
+        finally:
+            connection.close()
+        _spools.append(self)
+        self._thread = threading.Thread(target=self._run, name="vote-spool-drain", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def add(self, email_hash, selected_teams, voted_at=None):
+        """Accept a vote locally; False if this hash is already spooled"""
+        voted_at = voted_at or datetime.now()
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    cursor = connection.execute(
+                        "INSERT OR IGNORE INTO spooled_votes VALUES (?, ?, ?)",
+                        (email_hash, json.dumps(selected_teams), voted_at.isoformat())
+                    )
+            finally:
+                connection.close()
+        stored = cursor.rowcount == 1
+        if stored:
+            VOTES_SPOOLED.inc(event="accepted")
+        self._wake.set()
+        return stored
+
+    def contains(self, email_hash):
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT 1 FROM spooled_votes WHERE email_hash = ?", (email_hash,)).fetchone()
+        finally:
+            connection.close()
+        return row is not None
+
+    def pending(self):
+        """Number of votes waiting to reach the primary"""
+        connection = self._connect()
+        try:
+            return connection.execute("SELECT count(*) FROM spooled_votes").fetchone()[0]
+        finally:
+            connection.close()
+
+    def primary_available(self):
+        """False while the primary is in its back-off window after a failure"""
+        return time.monotonic() >= self.primary_down_until
+
+    def mark_primary_down(self):
+        self.primary_down_until = time.monotonic() + self.retry_seconds
+
+    def quarantined(self):
+        """Number of votes the primary rejected, kept aside for a manual look"""
+        connection = self._connect()
+        try:
+            return connection.execute("SELECT count(*) FROM quarantined_votes").fetchone()[0]
+        finally:
+            connection.close()
+
+    def clear(self):
+        """Drop every spooled and quarantined vote (the election is being reset)"""
+        with self._drain_lock, self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM spooled_votes")
+                    connection.execute("DELETE FROM quarantined_votes")
+            finally:
+                connection.close()
+
+    def drain(self):
+        """Move spooled votes to the primary; returns how many batches were drained.
+
+        Raises if the primary is unavailable; rows it rejects are quarantined.
+        """
+        drained = 0
+        while True:
+            with self._drain_lock:
+                connection = self._connect()
+                try:
+                    rows = connection.execute(
+                        "SELECT email_hash, selected_teams, voted_at FROM spooled_votes ORDER BY voted_at LIMIT ?",
+                        (self.batch_size,)
+                    ).fetchall()
+                finally:
+                    connection.close()
+                if not rows:
+                    return drained
+
+                try:
+                    self.drain_batch([_spooled_vote(row) for row in rows])
+                except Exception as error:
+                    if self._primary_unavailable(error):
+                        raise
+                    self._reset_after_failure()
+                    self._drain_singly(rows)
+                else:
+                    # Only delete after the primary committed; a crash here just drains the batch again
+                    self._delete(rows)
+                    VOTES_SPOOLED.inc(len(rows), event="drained")
+            self.primary_down_until = 0.0
+            drained += 1
+
+    def _primary_unavailable(self, error):
+        return self.unavailable is None or self.unavailable(error)
+
+    def _drain_singly(self, rows):
+        """Drain a rejected batch one row at a time, quarantining the rows the primary still rejects"""
+        for row in rows:
+            try:
+                self.drain_batch([_spooled_vote(row)])
+            except Exception as error:
+                if self._primary_unavailable(error):
+                    raise
+                self._reset_after_failure()
+                self._quarantine(row, error)
+            else:
+                self._delete([row])
+                VOTES_SPOOLED.inc(event="drained")
+
+    def _delete(self, rows):
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "DELETE FROM spooled_votes WHERE email_hash = ?", [(row[0],) for row in rows]
+                    )
+            finally:
+                connection.close()
+
+    def _quarantine(self, row, error):
+        logger.warning("quarantined spooled vote %s: %r", row[0][:12], error)
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO quarantined_votes VALUES (?, ?, ?, ?, ?)",
+                        (*row, repr(error)[:500], datetime.now().isoformat())
+                    )
+                    connection.execute("DELETE FROM spooled_votes WHERE email_hash = ?", (row[0],))
+            finally:
+                connection.close()
+        VOTES_SPOOLED.inc(event="quarantined")
+
+    def _reset_after_failure(self):
+        """Clear a failed drain transaction; only ever called from the drain thread"""
+        if self.reset is None:
+            return
+        try:
+            self.reset()
+        except Exception:
+            # Still unreachable; the next attempt resets again
+            pass
+
+    def _run(self):
+        while True:
+            # Votes left over from a previous run drain on start-up, then after every spooled vote
+            try:
+                self.drain()
+            except Exception:
+                self._reset_after_failure()
+                self.mark_primary_down()
+            self._wake.wait(self.retry_seconds)
+            self._wake.clear()
+            # Give the primary its back-off window before the next attempt
+            delay = self.primary_down_until - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+def _spooled_vote(row):
+    """(email_hash, selected_teams, voted_at) for drain_batch from a spooled_votes row"""
+    email_hash, selected_teams, voted_at = row
+    return email_hash, json.loads(selected_teams), datetime.fromisoformat(voted_at)
+
+VOTES_SPOOL_PENDING = REGISTRY.register(Gauge(
+    "election_votes_spool_pending", "Votes in the local spool not yet stored in the primary", ("path",),
+    callback=lambda: {(spool.path,): spool.pending() for spool in list(_spools)}))